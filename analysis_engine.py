@@ -0,0 +1,112 @@
+"""
+Sharded map-reduce analysis over a crawl output directory.
+
+Page records are streamed from the per-page JSON files that WebsiteCrawler
+writes, split into contiguous shards and analyzed in a process pool. Each
+shard runs the same login/signup/contact/navigation and feature detectors as
+WebsiteCrawler.analyze_structure and analyze_tribevest_features; partial
+results are merged in shard order, so the output matches an in-memory run
+while only one shard per worker is ever loaded.
+"""
+
+import json
+import os
+import re
+
+from tribevest_crawler import analyze_page_features, merge_feature_analysis, new_feature_analysis
+from web_crawler import (analyze_page_structure, finish_structure_analysis,
+                         merge_structure_analysis, new_structure_analysis)
+
+# Per-page files are named "<page_count>_<path>.json"
+PAGE_FILE_RE = re.compile(r'^(\d+)_.*\.json$')
+
+def iter_page_files(crawl_dir):
+    """Return the per-page JSON files of a crawl in crawl order.
+
+    The files are taken from the page_files list in crawl_summary.json, so
+    page files left in the directory by an earlier crawl are not analyzed.
+    Directories written before that list existed are scanned by file name.
+    """
+    summary_path = os.path.join(crawl_dir, 'crawl_summary.json')
+    if os.path.exists(summary_path):
+        with open(summary_path, encoding='utf-8') as f:
+            page_files = json.load(f).get('page_files')
+        if page_files is not None:
+            return [os.path.join(crawl_dir, name) for name in page_files]
+
+    numbered = []
+    for name in os.listdir(crawl_dir):
+        match = PAGE_FILE_RE.match(name)
+        if match:
+            numbered.append((int(match.group(1)), name))
+    return [os.path.join(crawl_dir, name) for _, name in sorted(numbered)]
+
+def load_templates(crawl_dir):
+    """Return the shared page blocks saved with a crawl, if any"""
+    path = os.path.join(crawl_dir, 'templates.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def iter_shards(paths, shard_size):
+    for i in range(0, len(paths), shard_size):
+        yield paths[i:i + shard_size]
+
+def feature_record(page_data):
+    """Adapt a per-page record to the input expected by analyze_page_features"""
+    return {
+        'status': 'success',
+        'title': page_data.get('title') or '',
+        'content': page_data.get('main_content') or '',
+    }
+
+def analyze_shard(paths):
+    """Map step: analyze one shard of page files into partial results"""
+    structure = new_structure_analysis()
+    features = new_feature_analysis()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            page_data = json.load(f)
+        # Marked near-duplicates are kept on disk but left out of the analysis
+        if page_data.get('near_duplicate_of'):
+            continue
+        analyze_page_structure(page_data['url'], page_data, structure)
+        analyze_page_features(feature_record(page_data), features)
+    return structure, features
+
+def run_analysis(crawl_dir, workers=None, shard_size=500):
+    """Analyze a crawl directory in parallel and write site_analysis.json and feature_analysis.json"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    paths = iter_page_files(crawl_dir)
+    if not paths:
+        print(f"No page records found in {crawl_dir}")
+        return None
+
+    structure = new_structure_analysis()
+    features = new_feature_analysis()
+    shards = list(iter_shards(paths, shard_size))
+
+    def reduce_results(results):
+        # Reduce step: merge partial results in shard order
+        for shard_structure, shard_features in results:
+            merge_structure_analysis(structure, shard_structure)
+            merge_feature_analysis(features, shard_features)
+
+    if workers == 1 or len(shards) == 1:
+        reduce_results(map(analyze_shard, shards))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reduce_results(pool.map(analyze_shard, shards))
+
+    analysis = finish_structure_analysis(structure, load_templates(crawl_dir))
+
+    with open(f"{crawl_dir}/site_analysis.json", 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, indent=2, ensure_ascii=False)
+
+    with open(f"{crawl_dir}/feature_analysis.json", 'w', encoding='utf-8') as f:
+        json.dump(features, f, indent=2, ensure_ascii=False)
+
+    print(f"Analysis completed. Analyzed {len(paths)} pages in {len(shards)} shard(s).")
+    return analysis
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Single command line entry point for the crawler scripts.
+
+Usage:
+    python crawler_cli.py crawl --url https://www.tribevest.com/ --max-pages 10
+    python crawler_cli.py crawl --tier discovery --tier-rule '/pricing=full' --promote-keyword login
+    python crawler_cli.py multi-crawl https://www.tribevest.com/ https://example.com/ --weight www.tribevest.com=2
+    python crawler_cli.py feature-crawl --url https://www.tribevest.com/
+    python crawler_cli.py focused --url https://www.tribevest.com/pricing
+    python crawler_cli.py analyze
+    python crawler_cli.py token 0x83E17aeB148d9b4b7Be0Be7C87dd73531a5a5738
+    python crawler_cli.py replay --warc-dir crawled_data/warc
+    python crawler_cli.py analyze-crawl --crawl-dir crawled_data
+    python crawler_cli.py startup-check
+
+Only argparse and the standard library are loaded at startup. The crawler
+modules are imported by the subcommand that needs them, and they in turn
+import requests, bs4 and trafilatura inside the functions that use them, so
+importing any crawler module stays cheap.
+"""
+
+import argparse
+import re
+import sys
+
+# Heavy third-party modules that must not be loaded just to start the CLI
+HEAVY_MODULES = ['requests', 'bs4', 'trafilatura']
+
+# Allowed startup overhead over a bare interpreter, in milliseconds
+STARTUP_BUDGET_MS = 60
+
+# Extraction tiers, as in web_crawler.TIERS
+TIERS = ['discovery', 'metadata', 'full']
+
+def cmd_crawl(args):
+    import web_crawler
+    web_crawler.main(args.url or web_crawler.DEFAULT_BASE_URL, max_pages=args.max_pages, output_dir=args.output_dir,
+                     warc_dir=args.warc_dir, use_templates=not args.no_templates,
+                     dedup_threshold=args.dedup_threshold, dedup_mode=args.dedup_mode,
+                     **tier_options(args))
+
+def cmd_multi_crawl(args):
+    import multi_site
+    seeds = list(args.seed)
+    if args.seeds_file:
+        with open(args.seeds_file, encoding='utf-8') as f:
+            seeds.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not seeds:
+        print("No seeds given")
+        return 1
+    multi_site.main(seeds, output_dir=args.output_dir, max_pages=args.max_pages, delay=args.delay,
+                    weights=dict(args.weight or []), workers=args.workers, warc_dir=args.warc_dir,
+                    dedup_threshold=args.dedup_threshold, dedup_mode=args.dedup_mode,
+                    **tier_options(args))
+
+def cmd_feature_crawl(args):
+    import tribevest_crawler
+    tribevest_crawler.main(args.url or tribevest_crawler.DEFAULT_BASE_URL, max_pages=args.max_pages, output_dir=args.output_dir, warc_dir=args.warc_dir)
+
+def cmd_focused(args):
+    import tribevest_focused_crawler
+    tribevest_focused_crawler.main(args.url or None, output_dir=args.output_dir, warc_dir=args.warc_dir)
+
+def cmd_analyze(args):
+    import focused_crawler
+    pages = None
+    if args.page:
+        # Accept NAME=URL pairs, falling back to the URL path as the name
+        pages = []
+        for spec in args.page:
+            name, sep, url = spec.partition('=')
+            if not sep:
+                url = spec
+                name = url.rstrip('/').rsplit('/', 1)[-1] or 'home'
+            pages.append({"url": url, "name": name})
+    focused_crawler.main(pages, output_dir=args.output_dir)
+
+def replay_directory(args, warc_dir, output_dir, base_url=None):
+    """Rebuild the outputs of every crawler with archives in warc_dir; return None if there were none"""
+    import tribevest_crawler
+    import tribevest_focused_crawler
+    import warc_archive
+    import web_crawler
+
+    def has_archives(prefix):
+        return bool(warc_archive.select_run(warc_archive.find_archives(warc_dir, prefix=prefix), args.run))
+
+    # Each crawler names its WARC files with its own prefix; rebuild the outputs of every one found
+    replayed = False
+    if has_archives(web_crawler.WARC_PREFIX):
+        if web_crawler.replay_archives(warc_dir, output_dir=output_dir, base_url=base_url,
+                                       workers=args.workers, run=args.run) is None:
+            return False
+        replayed = True
+    if has_archives(tribevest_crawler.WARC_PREFIX):
+        tribevest_crawler.replay_archives(warc_dir, output_dir=output_dir, workers=args.workers, run=args.run)
+        replayed = True
+    if has_archives(tribevest_focused_crawler.WARC_PREFIX):
+        tribevest_focused_crawler.replay_archives(warc_dir, output_dir=output_dir, workers=args.workers, run=args.run)
+        replayed = True
+    return True if replayed else None
+
+def cmd_replay(args):
+    import os
+    import multi_site
+
+    if not os.path.isdir(args.warc_dir):
+        print(f"No such directory: {args.warc_dir}")
+        return 1
+    result = replay_directory(args, args.warc_dir, args.output_dir, base_url=args.url)
+    if result is None:
+        # multi-crawl archives each host in its own subdirectory
+        results = [
+            replay_directory(args, os.path.join(args.warc_dir, name), os.path.join(args.output_dir, name))
+            for name in multi_site.site_dirs(args.warc_dir)
+        ]
+        results = [r for r in results if r is not None]
+        if not results:
+            print(f"No WARC files found in {args.warc_dir}")
+            return 1
+        result = all(results)
+    return 0 if result else 1
+
+def cmd_analyze_crawl(args):
+    import os
+    import analysis_engine
+    import multi_site
+
+    if not os.path.isdir(args.crawl_dir):
+        print(f"No such directory: {args.crawl_dir}")
+        return 1
+    crawl_dirs = [args.crawl_dir]
+    if not analysis_engine.iter_page_files(args.crawl_dir):
+        # multi-crawl writes each host's pages to its own subdirectory
+        crawl_dirs = [
+            os.path.join(args.crawl_dir, name) for name in multi_site.site_dirs(args.crawl_dir)
+            if analysis_engine.iter_page_files(os.path.join(args.crawl_dir, name))
+        ] or crawl_dirs
+    analyses = [analysis_engine.run_analysis(crawl_dir, workers=args.workers, shard_size=args.shard_size)
+                for crawl_dir in crawl_dirs]
+    return 0 if all(analysis is not None for analysis in analyses) else 1
+
+def cmd_token(args):
+    import get_bscscan_data
+    for address in args.address or [get_bscscan_data.DEFAULT_CONTRACT_ADDRESS]:
+        get_bscscan_data.get_bscscan_token_data(address)
+
+def measure_startup(runs=5):
+    """Return (overhead_ms, leaked_modules) for starting the CLI in a fresh interpreter"""
+    import os
+    import subprocess
+    import time
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = (
+        "import sys, crawler_cli, web_crawler, tribevest_crawler, tribevest_focused_crawler, "
+        "focused_crawler, get_bscscan_data; crawler_cli.build_parser(); "
+        "print(','.join(m for m in crawler_cli.HEAVY_MODULES if m in sys.modules))"
+    )
+
+    def best_of(code):
+        best = None
+        output = ''
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True, text=True, check=True)
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+            output = result.stdout.strip()
+        return best, output
+
+    baseline, _ = best_of('pass')
+    startup, leaked = best_of(probe)
+    overhead_ms = max(0.0, (startup - baseline) * 1000)
+    return overhead_ms, [m for m in leaked.split(',') if m]
+
+def cmd_startup_check(args):
+    overhead_ms, leaked = measure_startup(runs=args.runs)
+    print(f"Startup overhead: {overhead_ms:.1f} ms (budget {args.budget_ms} ms)")
+    if leaked:
+        print(f"Heavy modules imported at startup: {', '.join(leaked)}")
+    if leaked or overhead_ms > args.budget_ms:
+        return 1
+    return 0
+
+def host_weight(spec):
+    """Parse a HOST=WEIGHT option; weights must be positive"""
+    host, sep, weight = spec.partition('=')
+    if not sep:
+        return host, 1.0
+    try:
+        value = float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid weight in {spec!r}")
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"weight must be greater than 0 in {spec!r}")
+    return host, value
+
+def positive_int(value):
+    """Parse an option that must be a whole number of 1 or more"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be 1 or more")
+    return number
+
+def dedup_threshold(value):
+    """Parse --dedup-threshold, a number of differing SimHash bits"""
+    try:
+        threshold = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    from near_duplicates import MAX_THRESHOLD
+
+    if not 0 <= threshold <= MAX_THRESHOLD:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {MAX_THRESHOLD}")
+    return threshold
+
+def tier_rule(spec):
+    """Parse a REGEX=TIER option into (pattern, tier)"""
+    pattern, sep, tier = spec.rpartition('=')
+    if not sep or tier not in TIERS:
+        raise argparse.ArgumentTypeError(f"expected REGEX=TIER with TIER one of {', '.join(TIERS)}, got {spec!r}")
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid regex {pattern!r}: {e}")
+    return pattern, tier
+
+def tier_options(args):
+    return {'tier': args.tier, 'tier_rules': args.tier_rule or [], 'promote_keywords': args.promote_keyword}
+
+def add_tier_arguments(parser):
+    parser.add_argument('--tier', choices=TIERS, default='full', help="Extraction tier for pages no rule matches")
+    parser.add_argument('--tier-rule', action='append', type=tier_rule, help="REGEX=TIER extraction tier for matching URLs; first match wins")
+    parser.add_argument('--promote-keyword', action='append', help="Re-extract pages at full tier when their URL, title or headings mention this")
+
+def add_dedup_arguments(parser):
+    parser.add_argument('--dedup-threshold', type=dedup_threshold, help="Treat pages whose SimHash differs in at most this many bits as near-duplicates (e.g. 3, at most 16)")
+    parser.add_argument('--dedup-mode', choices=['mark', 'skip'], default='mark', help="Keep near-duplicates marked, or drop them; their links are never followed")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Website crawling and analysis tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl = subparsers.add_parser('crawl', help="Crawl a site and analyze its structure")
+    crawl.add_argument('--url', help="Start URL (default: https://www.tribevest.com/)")
+    crawl.add_argument('--max-pages', type=int, default=10)
+    crawl.add_argument('--output-dir', default='crawled_data')
+    crawl.add_argument('--warc-dir', help="Record raw responses as WARC files in this directory")
+    crawl.add_argument('--no-templates', action='store_true', help="Store navigation and buttons on every page instead of as shared templates")
+    add_dedup_arguments(crawl)
+    add_tier_arguments(crawl)
+    crawl.set_defaults(func=cmd_crawl)
+
+    multi_crawl = subparsers.add_parser('multi-crawl', help="Crawl several sites at once with host-fair scheduling")
+    multi_crawl.add_argument('seed', nargs='*', help="Start URL of a site")
+    multi_crawl.add_argument('--seeds-file', help="File with one start URL per line")
+    multi_crawl.add_argument('--max-pages', type=int, default=20, help="Page budget per site")
+    multi_crawl.add_argument('--delay', type=float, default=1.0, help="Politeness delay per host, in seconds")
+    multi_crawl.add_argument('--workers', type=positive_int, default=8, help="Concurrent requests across all hosts")
+    multi_crawl.add_argument('--weight', action='append', type=host_weight, help="HOST=WEIGHT share of requests (default 1)")
+    multi_crawl.add_argument('--output-dir', default='crawled_data')
+    multi_crawl.add_argument('--warc-dir', help="Record raw responses as WARC files in this directory")
+    add_dedup_arguments(multi_crawl)
+    add_tier_arguments(multi_crawl)
+    multi_crawl.set_defaults(func=cmd_multi_crawl)
+
+    feature_crawl = subparsers.add_parser('feature-crawl', help="Crawl a site and analyze its platform features")
+    feature_crawl.add_argument('--url', help="Start URL (default: https://www.tribevest.com/)")
+    feature_crawl.add_argument('--max-pages', type=int, default=20)
+    feature_crawl.add_argument('--output-dir', default='crawled_data')
+    feature_crawl.add_argument('--warc-dir', help="Record raw responses as WARC files in this directory")
+    feature_crawl.set_defaults(func=cmd_feature_crawl)
+
+    focused = subparsers.add_parser('focused', help="Fetch a fixed list of pages")
+    focused.add_argument('--url', action='append', help="Page to fetch; repeat for several (default: key Tribevest pages)")
+    focused.add_argument('--output-dir', default='crawled_data')
+    focused.add_argument('--warc-dir', help="Record raw responses as WARC files in this directory")
+    focused.set_defaults(func=cmd_focused)
+
+    analyze = subparsers.add_parser('analyze', help="Analyze key pages for features, pricing and login")
+    analyze.add_argument('--page', action='append', help="NAME=URL or URL; repeat for several (default: key Tribevest pages)")
+    analyze.add_argument('--output-dir', default='tribevest_analysis')
+    analyze.set_defaults(func=cmd_analyze)
+
+    replay = subparsers.add_parser('replay', help="Rebuild crawl outputs from WARC files offline")
+    replay.add_argument('--warc-dir', required=True)
+    replay.add_argument('--output-dir', default='crawled_data')
+    replay.add_argument('--url', help="Base URL of a site crawl (default: taken from the archive)")
+    replay.add_argument('--workers', type=positive_int, help="Worker processes (default: CPU count)")
+    replay.add_argument('--run', help="Crawl run to replay, as in the archive file names (default: the latest of each crawler)")
+    replay.set_defaults(func=cmd_replay)
+
+    analyze_crawl = subparsers.add_parser('analyze-crawl', help="Analyze a crawl output directory in parallel shards")
+    analyze_crawl.add_argument('--crawl-dir', default='crawled_data')
+    analyze_crawl.add_argument('--workers', type=positive_int, help="Worker processes (default: CPU count)")
+    analyze_crawl.add_argument('--shard-size', type=positive_int, default=500, help="Pages per shard")
+    analyze_crawl.set_defaults(func=cmd_analyze_crawl)
+
+    token = subparsers.add_parser('token', help="Look up token data on BSCScan")
+    token.add_argument('address', nargs='*', help="Contract address (default: the AXM contract)")
+    token.set_defaults(func=cmd_token)
+
+    startup_check = subparsers.add_parser('startup-check', help="Measure CLI startup time against the budget")
+    startup_check.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    startup_check.add_argument('--runs', type=int, default=5)
+    startup_check.set_defaults(func=cmd_startup_check)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,32 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import os
 from urllib.parse import urljoin
+from resilience import ResilientSession
 
-def analyze_tribevest():
+# Key pages to analyze
+DEFAULT_PAGES = [
+    {"url": "https://www.tribevest.com/", "name": "home"},
+    {"url": "https://www.tribevest.com/pricing", "name": "pricing"},
+    {"url": "https://www.tribevest.com/about", "name": "about"},
+    {"url": "https://www.tribevest.com/contact", "name": "contact"},
+]
+
+def analyze_tribevest(pages=None, output_dir="tribevest_analysis"):
     """Analyze the main Tribevest website and key pages"""
-    output_dir = "tribevest_analysis"
+    import requests
+    from bs4 import BeautifulSoup
+
+    if pages is None:
+        pages = DEFAULT_PAGES
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
     # Set up session with headers
-    session = requests.Session()
+    session = ResilientSession(requests.Session())
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     })
     
-    # Key pages to analyze
-    pages = [
-        {"url": "https://www.tribevest.com/", "name": "home"},
-        {"url": "https://www.tribevest.com/pricing", "name": "pricing"},
-        {"url": "https://www.tribevest.com/about", "name": "about"},
-        {"url": "https://www.tribevest.com/contact", "name": "contact"},
-    ]
-    
     site_data = {
         "pages": {},
         "features": [],
@@ -36,7 +39,7 @@ def analyze_tribevest():
     for page in pages:
         print(f"Analyzing {page['name']} page...")
         try:
-            response = session.get(page["url"], timeout=10)
+            response = session.get(page["url"])
             if response.status_code != 200:
                 print(f"Failed to access {page['url']}: Status code {response.status_code}")
                 continue
@@ -143,7 +146,7 @@ def analyze_tribevest():
     if site_data["login_url"]:
         try:
             print(f"Checking login page: {site_data['login_url']}")
-            response = session.get(site_data["login_url"], timeout=10)
+            response = session.get(site_data["login_url"])
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
@@ -179,9 +182,10 @@ def analyze_tribevest():
     
     return site_data
 
-if __name__ == "__main__":
+def main(pages=None, output_dir="tribevest_analysis"):
+    """Analyze the key pages and print a short summary"""
     print("Analyzing Tribevest website...")
-    site_data = analyze_tribevest()
+    site_data = analyze_tribevest(pages, output_dir=output_dir)
     
     print("\nWebsite Analysis Summary:")
     print(f"Pages analyzed: {len(site_data['pages'])}")
@@ -197,4 +201,9 @@ if __name__ == "__main__":
     print("\nKey features identified:")
     for i, feature in enumerate(site_data['features'][:5], 1):  # Show first 5 features
         if feature.get('title'):
-            print(f"{i}. {feature['title']}")
\ No newline at end of file
+            print(f"{i}. {feature['title']}")
+    
+    return site_data
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-import requests
-import trafilatura
+DEFAULT_CONTRACT_ADDRESS = "0x83E17aeB148d9b4b7Be0Be7C87dd73531a5a5738"
 
 def get_bscscan_token_data(contract_address):
     """
     Get token data from BSCScan for the verified contract
     """
+    import trafilatura
+
     url = f"https://bscscan.com/token/{contract_address}"
     
     try:
@@ -20,5 +21,4 @@ def get_bscscan_token_data(contract_address):
         print(f"Error fetching BSCScan data: {e}")
 
 if __name__ == "__main__":
-    contract_address = "0x83E17aeB148d9b4b7Be0Be7C87dd73531a5a5738"
-    get_bscscan_token_data(contract_address)
\ No newline at end of file
+    get_bscscan_token_data(DEFAULT_CONTRACT_ADDRESS)
@@ -0,0 +1,116 @@
+"""
+Fast link extraction for discovery-only fetches.
+
+Scans the raw response bytes in a single pass with a tag-level tokenizer and
+pulls out <a href>, <link rel href> and <base href> without building a DOM.
+Comments and the bodies of <script>/<style> elements are skipped so that
+markup inside them is not mistaken for links.
+"""
+
+from collections import namedtuple
+import html
+import re
+from urllib.parse import urljoin
+
+Link = namedtuple('Link', ['url', 'tag', 'rel'])
+
+# <link rel> values that point at other pages worth crawling
+NAVIGATIONAL_RELS = {'canonical', 'next', 'prev', 'previous', 'alternate'}
+
+# Start of a comment, of a raw-text element to skip, or of an a/link/base start tag
+START_RE = re.compile(rb'<(?:(?P<comment>!--)|(?P<raw>script|style)\b|(?P<tag>a|link|base)\b)', re.IGNORECASE)
+
+# Rest of a start tag up to its closing '>'. Quotes only delimit a value right
+# after '='; elsewhere they are ordinary characters, as in browsers. Atomic
+# groups keep a tag that never closes from being rescanned by backtracking.
+TAG_END_RE = re.compile(
+    rb'''(?P<attrs>(?>[^>="']+|["']|=\s*(?>"[^"]*"|'[^']*'|[^\s"'>][^\s>]*|(?=>)))*+)>'''
+)
+
+COMMENT_END = b'-->'
+
+RAW_END_RE = {
+    b'script': re.compile(rb'</script\s*>', re.IGNORECASE),
+    b'style': re.compile(rb'</style\s*>', re.IGNORECASE),
+}
+
+ATTR_RE = re.compile(
+    rb'''(?P<name>[^\s"'>/=]+)\s*(?:=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[^\s"'>][^\s>]*)))?''',
+)
+
+def parse_attrs(raw):
+    """Return a dict of lower-cased attribute names to decoded values"""
+    attrs = {}
+    for match in ATTR_RE.finditer(raw):
+        name = match.group('name').lower().decode('ascii', 'replace')
+        if name in attrs:
+            continue
+        value = match.group('dq')
+        if value is None:
+            value = match.group('sq')
+        if value is None:
+            value = match.group('uq') or b''
+        attrs[name] = html.unescape(value.decode('utf-8', 'replace')).strip()
+    return attrs
+
+def iter_raw_links(body):
+    """Yield (tag, href, rel) for every a/link/base tag in body, in document order.
+
+    Every byte is scanned a bounded number of times. A comment, raw-text
+    element or start tag left open at the end of the body runs to the end,
+    as in browsers, so the scan stops there.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8', 'replace')
+    pos = 0
+    while True:
+        start = START_RE.search(body, pos)
+        if start is None:
+            return
+        if start.group('comment'):
+            end = body.find(COMMENT_END, start.end())
+            if end < 0:
+                return
+            pos = end + len(COMMENT_END)
+            continue
+
+        tag_end = TAG_END_RE.match(body, start.end())
+        if tag_end is None:
+            return
+        pos = tag_end.end()
+
+        raw = start.group('raw')
+        if raw:
+            raw_end = RAW_END_RE[raw.lower()].search(body, pos)
+            if raw_end is None:
+                return
+            pos = raw_end.end()
+            continue
+
+        attrs = parse_attrs(tag_end.group('attrs'))
+        href = attrs.get('href')
+        if href:
+            yield start.group('tag').lower().decode('ascii'), href, attrs.get('rel', '').lower()
+
+def extract_links(body, page_url):
+    """Return (base_url, links) for a downloaded page body.
+
+    Links are resolved against the first <base href>, as browsers do, and
+    <link> elements are only kept when their rel is navigational.
+    """
+    raw_links = list(iter_raw_links(body))
+
+    base_url = page_url
+    for tag, href, _ in raw_links:
+        if tag == 'base':
+            base_url = urljoin(page_url, href)
+            break
+
+    links = []
+    for tag, href, rel in raw_links:
+        if tag == 'base':
+            continue
+        if tag == 'link' and not NAVIGATIONAL_RELS.intersection(rel.split()):
+            continue
+        links.append(Link(urljoin(base_url, href), tag, rel))
+    return base_url, links
@@ -0,0 +1,245 @@
+"""
+Multi-site crawling with host-fair scheduling.
+
+MultiSiteCrawler keeps one WebsiteCrawler and URL queue per host and runs
+page fetches in a thread pool. At most one request per host is in flight,
+and a host is not scheduled again until its politeness delay has passed;
+meanwhile the workers serve other hosts. Among the hosts that are ready, the
+one with the fewest requests per unit of weight goes next, so equal weights
+give round-robin and larger weights give a host a proportionally larger
+share. Each site has its own page budget and output directory, and a
+combined multi_site_summary.json is written at the end.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+from resilience import CircuitOpenError
+import warc_archive
+from web_crawler import MAX_CIRCUIT_WAITS, WebsiteCrawler
+
+def site_dir_name(host):
+    """Return the name of a host's output and archive subdirectory"""
+    return host.replace(':', '_')
+
+def site_dirs(directory):
+    """Return the per-host subdirectories of a multi-site output or archive directory"""
+    return sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+
+class SiteState:
+    """Scheduling state for one host"""
+
+    def __init__(self, crawler, max_pages, weight):
+        self.crawler = crawler
+        self.queue = deque([crawler.base_url])
+        self.max_pages = max_pages
+        self.weight = weight
+        self.pages = 0
+        self.requests = 0
+        self.in_flight = False
+        self.next_allowed = 0.0
+        self.last_dispatch = 0.0
+        self.first_request = None
+        self.last_response = None
+        self.circuit_waits = 0
+        self.gave_up = False
+
+    def wants_more(self):
+        """Skip queued URLs that were already crawled; return True if there is work left"""
+        if self.gave_up:
+            return False
+        while self.queue and self.crawler.is_visited(self.queue[0]):
+            self.queue.popleft()
+        # Promoted pages are re-extracted even once the page budget is spent
+        return bool(self.crawler.promotions) or (bool(self.queue) and self.pages < self.max_pages)
+
+    def next_url(self):
+        """Return (url, tier) to fetch next, preferring pages promoted to a richer tier"""
+        if self.crawler.promotions:
+            return self.crawler.promotions.popleft()
+        return self.queue.popleft(), None
+
+    def requeue(self, url, tier):
+        """Put back a URL whose request was refused by the host's circuit breaker"""
+        if tier is not None:
+            self.crawler.promotions.appendleft((url, tier))
+        else:
+            self.queue.appendleft(url)
+
+    def summary(self):
+        elapsed = 0.0
+        if self.first_request is not None and self.last_response is not None:
+            elapsed = self.last_response - self.first_request
+        return {
+            'base_url': self.crawler.base_url,
+            'output_dir': self.crawler.output_dir,
+            'weight': self.weight,
+            'max_pages': self.max_pages,
+            'pages_crawled': self.pages,
+            'requests': self.requests,
+            'near_duplicates': len(self.crawler.near_duplicates),
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_per_second': round(self.pages / elapsed, 3) if elapsed else 0.0
+        }
+
+class MultiSiteCrawler:
+    def __init__(self, seeds, output_dir="crawled_data", max_pages=20, delay=1.0,
+                 weights=None, workers=8, warc_dir=None, use_templates=True,
+                 dedup_threshold=None, dedup_mode='mark', tier='full', tier_rules=None,
+                 promote_keywords=None):
+        """seeds is a list of start URLs; max_pages is a per-site budget or a {host: budget} dict"""
+        self.output_dir = output_dir
+        self.delay = delay
+        self.workers = workers
+        self.sites = {}
+
+        weights = weights or {}
+        # One run id for all hosts so that replay --run selects the whole crawl
+        warc_run = warc_archive.new_run() if warc_dir else None
+        for seed in seeds:
+            host = urlparse(seed).netloc
+            if host in self.sites:
+                self.sites[host].queue.append(seed)
+                continue
+            budget = max_pages.get(host, 20) if isinstance(max_pages, dict) else max_pages
+            crawler = WebsiteCrawler(
+                seed,
+                output_dir=os.path.join(output_dir, site_dir_name(host)),
+                warc_dir=os.path.join(warc_dir, site_dir_name(host)) if warc_dir else None,
+                warc_run=warc_run,
+                use_templates=use_templates,
+                dedup_threshold=dedup_threshold,
+                dedup_mode=dedup_mode,
+                tier=tier,
+                tier_rules=tier_rules,
+                promote_keywords=promote_keywords
+            )
+            self.sites[host] = SiteState(crawler, budget, weights.get(host, 1.0))
+
+    def next_site(self, now):
+        """Pick the ready host with the fewest requests per unit of weight"""
+        ready = [
+            site for site in self.sites.values()
+            if not site.in_flight and site.next_allowed <= now and site.wants_more()
+        ]
+        if not ready:
+            return None
+        return min(ready, key=lambda site: (site.requests / site.weight, site.last_dispatch))
+
+    def next_wakeup(self, now):
+        """Seconds until the earliest idle host leaves its politeness delay, or None"""
+        waits = [
+            site.next_allowed - now for site in self.sites.values()
+            if not site.in_flight and site.wants_more()
+        ]
+        if not waits:
+            return None
+        return max(0.0, min(waits))
+
+    def crawl(self):
+        """Crawl all sites until every budget is spent or every queue is empty"""
+        start = time.monotonic()
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                now = time.monotonic()
+                while len(futures) < self.workers:
+                    site = self.next_site(now)
+                    if site is None:
+                        break
+                    url, tier = site.next_url()
+                    site.in_flight = True
+                    site.requests += 1
+                    site.last_dispatch = now
+                    if site.first_request is None:
+                        site.first_request = now
+                    futures[pool.submit(site.crawler.crawl_page, url, site.pages, tier)] = (site, url, tier)
+
+                if len(futures) >= self.workers:
+                    # Every worker is busy: nothing can be dispatched before one finishes
+                    wakeup = None
+                else:
+                    wakeup = self.next_wakeup(now)
+                    if not futures:
+                        if wakeup is None:
+                            break
+                        time.sleep(wakeup)
+                        continue
+
+                done, _ = wait(futures, timeout=wakeup, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site, url, tier = futures.pop(future)
+                    site.in_flight = False
+                    site.last_response = time.monotonic()
+                    site.next_allowed = site.last_response + self.delay
+
+                    try:
+                        page_data = future.result()
+                    except CircuitOpenError as e:
+                        # Nothing was sent: retry the URL once the breaker allows a probe
+                        site.requests -= 1
+                        site.circuit_waits += 1
+                        if site.circuit_waits > MAX_CIRCUIT_WAITS:
+                            print(f"Giving up on {site.crawler.base_url}: {e}")
+                            site.gave_up = True
+                        site.requeue(url, tier)
+                        site.next_allowed = site.last_response + e.retry_in
+                        continue
+
+                    if page_data is not None:
+                        site.circuit_waits = 0
+                        if tier is None:
+                            site.pages += 1
+                        site.queue.extend(site.crawler.new_links(page_data))
+
+        for site in self.sites.values():
+            site.crawler.finish_crawl()
+
+        return self.save_summary(time.monotonic() - start)
+
+    def analyze(self):
+        """Run the structure analysis of every site; return {host: analysis}"""
+        return {host: site.crawler.analyze_structure() for host, site in self.sites.items()}
+
+    def save_summary(self, elapsed):
+        """Save per-site and total throughput to multi_site_summary.json"""
+        total_pages = sum(site.pages for site in self.sites.values())
+        summary = {
+            'sites': {host: site.summary() for host, site in self.sites.items()},
+            'pages_crawled': total_pages,
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_per_second': round(total_pages / elapsed, 3) if elapsed else 0.0,
+            # Upper bound when every host is kept busy within its politeness delay
+            'politeness_limit_per_second': round(len(self.sites) / self.delay, 3) if self.delay else None
+        }
+
+        with open(f"{self.output_dir}/multi_site_summary.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(f"Multi-site crawl completed. Crawled {total_pages} pages from {len(self.sites)} sites in {elapsed:.1f}s.")
+        return summary
+
+def main(seeds, output_dir="crawled_data", max_pages=20, delay=1.0, weights=None, workers=8, warc_dir=None,
+         dedup_threshold=None, dedup_mode='mark', tier='full', tier_rules=None, promote_keywords=None):
+    """Crawl several sites at once, analyze each and print a short report"""
+    os.makedirs(output_dir, exist_ok=True)
+    crawler = MultiSiteCrawler(seeds, output_dir=output_dir, max_pages=max_pages, delay=delay,
+                               weights=weights, workers=workers, warc_dir=warc_dir,
+                               dedup_threshold=dedup_threshold, dedup_mode=dedup_mode, tier=tier,
+                               tier_rules=tier_rules, promote_keywords=promote_keywords)
+    summary = crawler.crawl()
+    analyses = crawler.analyze()
+
+    print("\nPer-site summary:")
+    for host, site_summary in summary['sites'].items():
+        analysis = analyses.get(host) or {}
+        print(f" - {host}: {site_summary['pages_crawled']} pages, "
+              f"login={analysis.get('has_login', False)}, signup={analysis.get('has_signup', False)}, "
+              f"contact={analysis.get('has_contact_form', False)}")
+
+    return summary
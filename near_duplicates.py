@@ -0,0 +1,95 @@
+"""
+SimHash near-duplicate detection for crawled pages.
+
+simhash() turns the extracted main content of a page into a 64-bit
+signature in which similar texts differ in only a few bits. The index
+splits each signature into threshold + 1 bands: by the pigeonhole principle
+two signatures within the Hamming distance threshold agree exactly on at
+least one band, so a lookup only compares against pages sharing a band
+bucket rather than against every page seen so far.
+"""
+
+import hashlib
+import re
+
+SIGNATURE_BITS = 64
+
+# Largest supported Hamming distance threshold. Each band must stay wide
+# enough to spread signatures over many buckets; at SIGNATURE_BITS or more
+# some bands would be empty and every lookup would become linear.
+MAX_THRESHOLD = 16
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(text, shingle_size=3):
+    """Return the 64-bit SimHash of text built from word shingles"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    counts = [0] * SIGNATURE_BITS
+    for shingle in shingles:
+        h = token_hash(shingle)
+        for bit in range(SIGNATURE_BITS):
+            if h >> bit & 1:
+                counts[bit] += 1
+            else:
+                counts[bit] -= 1
+
+    signature = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            signature |= 1 << bit
+    return signature
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+class NearDuplicateIndex:
+    """Banded index of SimHash signatures for sub-linear near-duplicate lookup"""
+
+    def __init__(self, threshold=3, min_words=20):
+        if not 0 <= threshold <= MAX_THRESHOLD:
+            raise ValueError(f"threshold must be between 0 and {MAX_THRESHOLD}, got {threshold}")
+        self.threshold = threshold
+        self.min_words = min_words
+        self.band_count = threshold + 1
+        # Spread the 64 bits as evenly as possible over the bands
+        widths = [SIGNATURE_BITS // self.band_count + (1 if i < SIGNATURE_BITS % self.band_count else 0)
+                  for i in range(self.band_count)]
+        self.bands = []
+        shift = 0
+        for width in widths:
+            self.bands.append((shift, (1 << width) - 1))
+            shift += width
+        self.buckets = {}
+
+    def band_keys(self, signature):
+        return [(i, signature >> shift & mask) for i, (shift, mask) in enumerate(self.bands)]
+
+    def signature(self, text):
+        """Return the signature of text, or None if it is too short to compare"""
+        if not text or len(WORD_RE.findall(text)) < self.min_words:
+            return None
+        return simhash(text)
+
+    def find(self, signature):
+        """Return the url of an indexed page within the threshold, or None"""
+        checked = set()
+        for key in self.band_keys(signature):
+            for other, url in self.buckets.get(key, ()):
+                if url in checked:
+                    continue
+                checked.add(url)
+                if hamming_distance(signature, other) <= self.threshold:
+                    return url
+        return None
+
+    def add(self, url, signature):
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, []).append((signature, url))
@@ -0,0 +1,210 @@
+"""
+Retry, adaptive timeout and circuit breaker handling for crawler HTTP requests.
+
+ResilientSession wraps a requests.Session and is used by the crawlers in place
+of bare session.get / requests.get calls:
+
+- idempotent requests (GET/HEAD) are retried with exponential backoff on
+  connection errors, timeouts and 429/5xx responses
+- each host gets a timeout derived from the latencies observed for it so far
+- a per-host circuit breaker stops sending requests to a host that keeps
+  failing and lets a single probe through once its cooldown has passed
+
+Pass a recorder (e.g. warc_archive.WarcWriter) to archive every response
+returned to the caller.
+"""
+
+from collections import deque
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's circuit is open"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number attempt (starting at 1)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+class HostTimeouts:
+    """Per-host request timeouts derived from observed latency percentiles"""
+
+    def __init__(self, default=10.0, minimum=2.0, maximum=10.0, percentile=0.95,
+                 multiplier=3.0, min_samples=5, window=50):
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.window = window
+        self.samples = {}
+
+    def record(self, host, latency):
+        if host not in self.samples:
+            self.samples[host] = deque(maxlen=self.window)
+        self.samples[host].append(latency)
+
+    def timeout_for(self, host):
+        samples = self.samples.get(host)
+        if not samples or len(samples) < self.min_samples:
+            return min(self.default, self.maximum)
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.minimum, min(self.maximum, ordered[index] * self.multiplier))
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for a single host, safe to share between threads"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, probe_wait=1.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        # How long other callers are told to wait while the probe is in flight
+        self.probe_wait = probe_wait
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return seconds until the next attempt is allowed, or 0 if it is allowed now"""
+        with self.lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.cooldown - now
+                if remaining > 0:
+                    return remaining
+                self.state = self.HALF_OPEN
+                self.probe_started = None
+            if self.state == self.HALF_OPEN:
+                # Let a single probe request through; a probe that never reported
+                # back (e.g. it raised an unrelated error) expires after the cooldown
+                if self.probe_started is not None and now - self.probe_started < self.cooldown:
+                    return self.probe_wait
+                self.probe_started = now
+            return 0
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_started = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_started = None
+
+class ResilientSession:
+    """requests.Session wrapper adding retries, adaptive timeouts and circuit breaking"""
+
+    def __init__(self, session=None, retry_policy=None, timeouts=None,
+                 failure_threshold=5, cooldown=30.0, recorder=None):
+        import requests
+
+        self.session = session or requests.Session()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeouts = timeouts or HostTimeouts()
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.recorder = recorder
+        self.breakers = {}
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def breaker_for(self, host):
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.failure_threshold, self.cooldown)
+        return self.breakers[host]
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """Send a request, retrying idempotent methods and honouring the host's breaker"""
+        import requests
+
+        host = urlparse(url).netloc
+        breaker = self.breaker_for(host)
+        retries = self.retry_policy.max_retries if method.upper() in IDEMPOTENT_METHODS else 0
+        explicit_timeout = kwargs.pop('timeout', None)
+
+        attempt = 0
+        while True:
+            wait = breaker.allow()
+            if wait:
+                raise CircuitOpenError(host, wait)
+
+            timeout = self.timeouts.timeout_for(host)
+            if explicit_timeout is not None:
+                timeout = min(timeout, explicit_timeout)
+
+            retry_after = None
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                if attempt >= retries or breaker.state == CircuitBreaker.OPEN:
+                    raise
+            else:
+                self.timeouts.record(host, time.monotonic() - start)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return self.recorded(response)
+                breaker.record_failure()
+                if attempt >= retries or breaker.state == CircuitBreaker.OPEN:
+                    return self.recorded(response)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            attempt += 1
+            time.sleep(self.retry_policy.delay(attempt, retry_after))
+
+    def recorded(self, response):
+        if self.recorder is not None:
+            # Redirect hops first, so replay can tell which URL was requested
+            for hop in response.history:
+                self.recorder.write_response(hop)
+            self.recorder.write_response(response)
+        return response
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header given in seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
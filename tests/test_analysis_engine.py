@@ -0,0 +1,82 @@
+import json
+import os
+
+import analysis_engine
+from web_crawler import (analyze_page_structure, finish_structure_analysis,
+                         merge_structure_analysis, new_structure_analysis)
+
+TEMPLATES = {
+    'nav1': {
+        'navigation': [{'text': 'Home', 'url': 'https://example.com/'}, {'text': 'Login', 'url': 'https://example.com/login'}],
+        'buttons': [{'text': 'Sign in', 'href': '/login'}],
+    },
+}
+
+def make_page(i):
+    forms = []
+    if i % 3 == 0:
+        forms.append({'action': '/session', 'method': 'post', 'fields': [
+            {'type': 'email', 'name': 'email'}, {'type': 'password', 'name': 'password'}]})
+    if i % 4 == 1:
+        forms.append({'action': '/contact', 'method': 'post', 'fields': [{'type': 'email', 'name': 'email'}]})
+    return {
+        'url': f'https://example.com/page{i}',
+        'title': 'Contact us' if i % 4 == 1 else f'Page {i}',
+        'main_content': f'Page {i} talks about investment groups and bank accounts',
+        'navigation': [{'text': f'Section {i % 5}', 'url': f'https://example.com/s{i % 5}/{i % 2}'}],
+        'forms': forms,
+        'buttons': [{'text': 'Join now' if i % 2 else 'Read more', 'href': f'/b{i}'}],
+        'templates': ['nav1'] if i % 2 else [],
+    }
+
+PAGES = [make_page(i) for i in range(11)]
+
+def serial_analysis(pages):
+    analysis = new_structure_analysis()
+    for page in pages:
+        analyze_page_structure(page['url'], page, analysis)
+    return finish_structure_analysis(analysis, TEMPLATES)
+
+def sharded_analysis(pages, shard_size):
+    analysis = new_structure_analysis()
+    for i in range(0, len(pages), shard_size):
+        partial = new_structure_analysis()
+        for page in pages[i:i + shard_size]:
+            analyze_page_structure(page['url'], page, partial)
+        merge_structure_analysis(analysis, partial)
+    return finish_structure_analysis(analysis, TEMPLATES)
+
+def test_merged_shards_match_serial_analysis():
+    expected = serial_analysis(PAGES)
+    assert expected['has_login'] and expected['has_signup'] and expected['has_contact_form']
+    for shard_size in (1, 2, 3, 5, 11):
+        assert sharded_analysis(PAGES, shard_size) == expected
+
+def write_crawl(crawl_dir, pages):
+    page_files = []
+    for i, page in enumerate(pages):
+        name = f'{i}_page{i}.json'
+        (crawl_dir / name).write_text(json.dumps(page))
+        page_files.append(name)
+    summary = {'page_list': [page['url'] for page in pages], 'page_files': page_files}
+    (crawl_dir / 'crawl_summary.json').write_text(json.dumps(summary))
+    (crawl_dir / 'templates.json').write_text(json.dumps(TEMPLATES))
+
+def test_run_analysis_matches_serial_analysis(tmp_path):
+    write_crawl(tmp_path, PAGES)
+    analysis = analysis_engine.run_analysis(str(tmp_path), workers=1, shard_size=4)
+    assert analysis == serial_analysis(PAGES)
+    assert json.loads((tmp_path / 'site_analysis.json').read_text()) == json.loads(json.dumps(analysis))
+
+def test_page_files_from_an_earlier_crawl_are_ignored(tmp_path):
+    (tmp_path / '40_old.json').write_text(json.dumps(make_page(40)))
+    write_crawl(tmp_path, PAGES[:3])
+    paths = analysis_engine.iter_page_files(str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == ['0_page0.json', '1_page1.json', '2_page2.json']
+
+def test_directories_without_page_files_are_scanned_in_crawl_order(tmp_path):
+    for i in (10, 2, 1):
+        (tmp_path / f'{i}_page{i}.json').write_text(json.dumps(make_page(i)))
+    (tmp_path / 'crawl_summary.json').write_text(json.dumps({'page_list': []}))
+    paths = analysis_engine.iter_page_files(str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == ['1_page1.json', '2_page2.json', '10_page10.json']
@@ -0,0 +1,30 @@
+import pytest
+
+import crawler_cli
+
+def parse(*argv):
+    return crawler_cli.build_parser().parse_args(list(argv))
+
+@pytest.mark.parametrize('argv', [
+    ['analyze-crawl', '--workers', '0'],
+    ['analyze-crawl', '--shard-size', '0'],
+    ['analyze-crawl', '--shard-size', '-1'],
+    ['replay', '--warc-dir', 'w', '--workers', '0'],
+    ['multi-crawl', '--workers', 'many'],
+    ['crawl', '--dedup-threshold', '-1'],
+    ['crawl', '--dedup-threshold', '17'],
+    ['multi-crawl', '--dedup-threshold', '64'],
+])
+def test_rejects_out_of_range_numbers(argv, capsys):
+    with pytest.raises(SystemExit) as error:
+        parse(*argv)
+    assert error.value.code == 2
+    assert 'argument --' in capsys.readouterr().err
+
+def test_accepts_positive_counts():
+    args = parse('analyze-crawl', '--workers', '2', '--shard-size', '10')
+    assert (args.workers, args.shard_size) == (2, 10)
+
+def test_accepts_dedup_thresholds_up_to_the_maximum():
+    assert parse('crawl', '--dedup-threshold', '0').dedup_threshold == 0
+    assert parse('crawl', '--dedup-threshold', '16').dedup_threshold == 16
@@ -0,0 +1,77 @@
+import time
+
+from link_extractor import extract_links, iter_raw_links
+
+PAGE_URL = 'https://example.com/docs/page.html'
+
+def urls(body, page_url=PAGE_URL):
+    return [link.url for link in extract_links(body, page_url)[1]]
+
+def test_resolves_relative_links():
+    body = b'<a href="next.html">Next</a><a href="/about">About</a>'
+    assert urls(body) == ['https://example.com/docs/next.html', 'https://example.com/about']
+
+def test_quoted_attribute_values_may_contain_gt():
+    body = b'<a title="a > b" href="/one">1</a><a data-x=\'>\' href="/two">2</a>'
+    assert urls(body) == ['https://example.com/one', 'https://example.com/two']
+
+def test_attribute_quoting_styles_and_entities():
+    body = b'<A HREF=/plain>x</A><a href=\'/single\'>y</a><a href="/q?a=1&amp;b=2">z</a>'
+    assert urls(body) == ['https://example.com/plain', 'https://example.com/single', 'https://example.com/q?a=1&b=2']
+
+def test_skips_comments_scripts_and_styles():
+    body = (b'<!-- <a href="/commented">x</a> -->'
+            b'<script>var s = "<a href=\'/scripted\'>";</script>'
+            b'<style>a[href="/styled"] {}</style>'
+            b'<a href="/real">real</a>')
+    assert urls(body) == ['https://example.com/real']
+
+def test_base_href_applies_to_all_links():
+    body = b'<a href="early">e</a><base href="https://cdn.example.com/root/"><a href="late">l</a>'
+    base_url, links = extract_links(body, PAGE_URL)
+    assert base_url == 'https://cdn.example.com/root/'
+    assert [link.url for link in links] == ['https://cdn.example.com/root/early', 'https://cdn.example.com/root/late']
+
+def test_only_navigational_link_rels_are_kept():
+    body = (b'<link rel="stylesheet" href="/site.css">'
+            b'<link rel="canonical" href="/canonical">'
+            b'<link rel="Next Prefetch" href="/page/2">')
+    _, links = extract_links(body, PAGE_URL)
+    assert [(link.url, link.tag) for link in links] == [
+        ('https://example.com/canonical', 'link'),
+        ('https://example.com/page/2', 'link'),
+    ]
+
+def test_ignores_anchors_without_href_and_similar_tags():
+    body = b'<a name="top">t</a><a href="">empty</a><abbr href="/abbr">x</abbr><area href="/area">'
+    assert list(iter_raw_links(body)) == []
+
+def test_accepts_text_bodies():
+    assert urls('<a href="/café">café</a>') == ['https://example.com/café']
+
+def test_quotes_inside_unquoted_values_and_text_are_ordinary_characters():
+    body = b"<a title=it's href=/a>a</a><a href=/b>b</a><a href=/c>c</a><p>don't</p><a href=/d>d</a>"
+    assert urls(body) == ['https://example.com/a', 'https://example.com/b',
+                          'https://example.com/c', 'https://example.com/d']
+    _, href, _ = next(iter_raw_links(b"<a title=it's href=/a>"))
+    assert href == '/a'
+
+def test_stray_quotes_in_attribute_names_do_not_hide_links():
+    assert urls(b'<a "odd" href="/one">1</a><a href=/two>2</a>') == ['https://example.com/one', 'https://example.com/two']
+
+def test_empty_attribute_value_before_the_end_of_the_tag():
+    assert urls(b'<a data-x= href=/one>1</a><a href= >2</a><a href=/two>') == ['https://example.com/two']
+
+def test_unclosed_constructs_run_to_the_end_of_the_body():
+    assert urls(b'<a href="/one">1</a><!-- <a href="/two">') == ['https://example.com/one']
+    assert urls(b'<a href="/one">1</a><script>var a = "<a href=/two>";') == ['https://example.com/one']
+    assert urls(b'<a href="/one">1</a><a href="/two>2</a>') == ['https://example.com/one']
+
+def test_malformed_bodies_are_scanned_in_linear_time():
+    bodies = [b'<a href="' * 20000, b"<a href='x' " * 20000, b'<script>' * 20000,
+              b'<style>' * 20000, b'<!--' * 40000, b'<a ' * 60000]
+    start = time.perf_counter()
+    for body in bodies:
+        assert list(iter_raw_links(body)) == []
+    # A quadratic scan takes tens of seconds on these
+    assert time.perf_counter() - start < 2.0
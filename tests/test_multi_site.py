@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import pytest
+
+import multi_site
+from resilience import CircuitOpenError
+from web_crawler import MAX_CIRCUIT_WAITS, WebsiteCrawler
+
+SEEDS = ['https://a.example/', 'https://b.example/']
+
+class FakeFetches:
+    """Stands in for WebsiteCrawler.crawl_page: every page links to two new ones"""
+
+    def __init__(self, refuse=None):
+        self.calls = []
+        self.lock = threading.Lock()
+        # {host: number of leading requests refused by an open circuit}
+        self.refuse = dict(refuse or {})
+
+    def __call__(self, crawler, url, page_count, tier=None):
+        host = urlparse(url).netloc
+        started = time.monotonic()
+        with self.lock:
+            if self.refuse.get(host):
+                self.refuse[host] -= 1
+                raise CircuitOpenError(host, 0.01)
+        crawler.visited_urls.add(crawler.clean_url(url))
+        time.sleep(0.001)
+        with self.lock:
+            self.calls.append((host, url, started, time.monotonic()))
+        n = len(crawler.visited_urls)
+        return {'links': [{'url': f'https://{host}/p{n}-{i}'} for i in range(2)]}
+
+@pytest.fixture
+def fetches(monkeypatch):
+    fake = FakeFetches()
+    monkeypatch.setattr(WebsiteCrawler, 'crawl_page', lambda self, *args: fake(self, *args))
+    return fake
+
+def make(tmp_path, **kwargs):
+    kwargs.setdefault('delay', 0.0)
+    return multi_site.MultiSiteCrawler(SEEDS, output_dir=str(tmp_path), **kwargs)
+
+def test_per_site_budgets(tmp_path, fetches):
+    summary = make(tmp_path, max_pages={'a.example': 3, 'b.example': 5}, workers=2).crawl()
+    assert Counter(host for host, *_ in fetches.calls) == {'a.example': 3, 'b.example': 5}
+    assert summary['sites']['a.example']['pages_crawled'] == 3
+    assert summary['sites']['b.example']['pages_crawled'] == 5
+    assert summary['pages_crawled'] == 8
+
+def test_weights_share_the_workers(tmp_path, fetches):
+    make(tmp_path, max_pages=40, workers=1, weights={'a.example': 3.0}).crawl()
+    first = Counter(host for host, *_ in fetches.calls[:20])
+    assert first == {'a.example': 15, 'b.example': 5}
+
+def test_equal_weights_alternate(tmp_path, fetches):
+    make(tmp_path, max_pages=4, workers=1).crawl()
+    assert [host for host, *_ in fetches.calls] == ['a.example', 'b.example'] * 4
+
+def test_politeness_delay_per_host(tmp_path, fetches):
+    delay = 0.05
+    make(tmp_path, max_pages=4, workers=4, delay=delay).crawl()
+    for host in ('a.example', 'b.example'):
+        calls = [(start, end) for call_host, _, start, end in fetches.calls if call_host == host]
+        assert len(calls) == 4
+        for (_, previous_end), (start, _) in zip(calls, calls[1:]):
+            assert start - previous_end >= delay - 0.005
+    # The hosts are crawled side by side, not one after the other
+    hosts_in_order = [host for host, *_ in sorted(fetches.calls, key=lambda call: call[2])]
+    assert hosts_in_order[:2] != ['a.example', 'a.example']
+
+def test_refused_urls_are_requeued(tmp_path, fetches):
+    fetches.refuse = {'a.example': 2}
+    summary = make(tmp_path, max_pages=3, workers=2).crawl()
+    a_urls = [url for host, url, *_ in fetches.calls if host == 'a.example']
+    assert a_urls[0] == 'https://a.example/'
+    assert summary['sites']['a.example']['pages_crawled'] == 3
+    # Refused attempts are not counted as requests
+    assert summary['sites']['a.example']['requests'] == 3
+
+def test_host_is_given_up_after_repeated_refusals(tmp_path, fetches):
+    fetches.refuse = {'a.example': MAX_CIRCUIT_WAITS + 10}
+    summary = make(tmp_path, max_pages=3, workers=2).crawl()
+    assert summary['sites']['a.example']['pages_crawled'] == 0
+    assert summary['sites']['b.example']['pages_crawled'] == 3
+    refused = MAX_CIRCUIT_WAITS + 10 - fetches.refuse['a.example']
+    assert refused == MAX_CIRCUIT_WAITS + 1
+
+def test_site_dirs_lists_host_subdirectories(tmp_path):
+    (tmp_path / 'a.example').mkdir()
+    (tmp_path / 'localhost_8000').mkdir()
+    (tmp_path / 'multi_site_summary.json').write_text('{}')
+    assert multi_site.site_dirs(str(tmp_path)) == ['a.example', 'localhost_8000']
+    assert multi_site.site_dir_name('localhost:8000') == 'localhost_8000'
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from near_duplicates import MAX_THRESHOLD, SIGNATURE_BITS, NearDuplicateIndex, hamming_distance, simhash
+
+def flip_bits(signature, bits):
+    for bit in bits:
+        signature ^= 1 << bit
+    return signature
+
+def test_bands_cover_all_bits_once():
+    for threshold in (0, 1, 3, 6, MAX_THRESHOLD):
+        index = NearDuplicateIndex(threshold)
+        assert len(index.bands) == threshold + 1
+        covered = 0
+        for shift, mask in index.bands:
+            assert covered & (mask << shift) == 0
+            covered |= mask << shift
+        assert covered == (1 << SIGNATURE_BITS) - 1
+
+def test_finds_every_signature_within_threshold():
+    rng = random.Random(7)
+    index = NearDuplicateIndex(threshold=3)
+    original = rng.getrandbits(SIGNATURE_BITS)
+    index.add('https://example.com/a', original)
+    for _ in range(200):
+        distance = rng.randint(0, 3)
+        near = flip_bits(original, rng.sample(range(SIGNATURE_BITS), distance))
+        assert index.find(near) == 'https://example.com/a'
+
+def test_ignores_signatures_beyond_threshold():
+    rng = random.Random(11)
+    index = NearDuplicateIndex(threshold=3)
+    original = rng.getrandbits(SIGNATURE_BITS)
+    index.add('https://example.com/a', original)
+    for _ in range(200):
+        far = flip_bits(original, rng.sample(range(SIGNATURE_BITS), rng.randint(4, 20)))
+        assert index.find(far) is None
+
+def test_returns_first_indexed_match():
+    index = NearDuplicateIndex(threshold=2)
+    index.add('https://example.com/a', 0)
+    index.add('https://example.com/b', 0b1)
+    assert index.find(0b11) == 'https://example.com/a'
+    assert index.find((1 << SIGNATURE_BITS) - 1) is None
+
+def test_short_texts_have_no_signature():
+    index = NearDuplicateIndex(min_words=5)
+    assert index.signature('') is None
+    assert index.signature('only four words here') is None
+    assert index.signature('now there are five words') == simhash('now there are five words')
+
+def test_similar_texts_have_close_signatures():
+    words = [f'word{i}' for i in range(200)]
+    text = ' '.join(words)
+    edited = ' '.join(words[:100] + ['changed'] + words[101:])
+    unrelated = ' '.join(f'other{i}' for i in range(200))
+    assert hamming_distance(simhash(text), simhash(edited)) <= 6
+    assert hamming_distance(simhash(text), simhash(unrelated)) > 12
+
+@pytest.mark.parametrize('threshold', [-1, MAX_THRESHOLD + 1, SIGNATURE_BITS])
+def test_rejects_thresholds_out_of_range(threshold):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold)
+
+def test_every_band_spreads_signatures_at_the_maximum_threshold():
+    index = NearDuplicateIndex(MAX_THRESHOLD)
+    assert min(mask.bit_length() for _, mask in index.bands) >= 3
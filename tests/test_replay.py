@@ -0,0 +1,92 @@
+import json
+import os
+from types import SimpleNamespace
+
+import warc_archive
+import web_crawler
+
+HEADER = ('<header><nav class="menu"><a href="/">Home</a><a href="/a">A</a>'
+          '<a href="/b">B</a><a href="/login">Log in</a></nav></header>')
+
+def html_page(title, body=''):
+    return f'<html><head><title>{title}</title></head><body>{HEADER}<h1>{title}</h1>{body}</body></html>'.encode('utf-8')
+
+PAGES = [
+    ('https://example.com/', html_page('Home')),
+    ('https://example.com/a', html_page('A')),
+    ('https://example.com/b', html_page('B')),
+]
+
+def archive(warc_dir, info, pages=PAGES):
+    writer = warc_archive.WarcWriter(str(warc_dir), prefix=web_crawler.WARC_PREFIX, info=info)
+    for url, body in pages:
+        writer.write_response(SimpleNamespace(url=url, status_code=200, reason='OK', content=body,
+                                              headers={'Content-Type': 'text/html; charset=utf-8'},
+                                              raw=SimpleNamespace(version=11)))
+    writer.close()
+
+def load_pages(output_dir):
+    with open(os.path.join(output_dir, 'crawl_summary.json'), encoding='utf-8') as f:
+        summary = json.load(f)
+    pages = []
+    for name in summary['page_files']:
+        with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+            pages.append(json.load(f))
+    return pages
+
+def load_templates(output_dir):
+    with open(os.path.join(output_dir, 'templates.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def test_replay_uses_templates_when_the_crawl_did(tmp_path):
+    archive(tmp_path / 'warc', {'base-url': 'https://example.com/', 'use-templates': 'true'})
+    output_dir = str(tmp_path / 'out')
+    web_crawler.replay_archives(str(tmp_path / 'warc'), output_dir=output_dir, workers=1)
+
+    templates = load_templates(output_dir)
+    assert len(templates) == 1
+    first, second, third = load_pages(output_dir)
+    assert len(first['navigation']) == 4 and first['templates'] == []
+    assert second['navigation'] == [] and second['templates'] == list(templates)
+    assert third['templates'] == list(templates)
+
+def test_replay_keeps_blocks_on_the_page_without_templates(tmp_path):
+    archive(tmp_path / 'warc', {'base-url': 'https://example.com/', 'use-templates': 'false'})
+    output_dir = str(tmp_path / 'out')
+    web_crawler.replay_archives(str(tmp_path / 'warc'), output_dir=output_dir, workers=1)
+
+    assert load_templates(output_dir) == {}
+    for page_data in load_pages(output_dir):
+        assert len(page_data['navigation']) == 4
+        assert page_data['templates'] == []
+
+def test_replay_extracts_pages_at_the_crawl_tiers(tmp_path):
+    archive(tmp_path / 'warc', {'base-url': 'https://example.com/', 'use-templates': 'true', 'tier': 'metadata',
+                                'tier-rules': json.dumps([['/b$', 'discovery']]), 'promote-keywords': '[]'})
+    output_dir = str(tmp_path / 'out')
+    web_crawler.replay_archives(str(tmp_path / 'warc'), output_dir=output_dir, workers=1)
+
+    home, a, b = load_pages(output_dir)
+    assert (home['tier'], a['tier'], b['tier']) == ('metadata', 'metadata', 'discovery')
+    assert home['title'] == 'Home' and home['main_content'] is None
+    assert b['title'] == '' and 'https://example.com/login' in [link['url'] for link in b['links']]
+
+def test_replay_re_extracts_promoted_pages_at_full_tier(tmp_path):
+    pages = PAGES + [('https://example.com/c', html_page('Member login', '<p>Sign in here.</p>'))]
+    archive(tmp_path / 'warc', {'base-url': 'https://example.com/', 'use-templates': 'false', 'tier': 'metadata',
+                                'tier-rules': '[]', 'promote-keywords': json.dumps(['login'])}, pages)
+    output_dir = str(tmp_path / 'out')
+    web_crawler.replay_archives(str(tmp_path / 'warc'), output_dir=output_dir, workers=1)
+
+    assert [page_data['tier'] for page_data in load_pages(output_dir)] == ['metadata', 'metadata', 'metadata', 'full']
+
+def test_crawler_records_its_tiers_for_replay(tmp_path):
+    crawler = web_crawler.WebsiteCrawler('https://example.com/', output_dir=str(tmp_path / 'out'),
+                                         warc_dir=str(tmp_path / 'warc'), tier='discovery',
+                                         tier_rules=[('/pricing', 'full')], promote_keywords=['Login'])
+    crawler.recorder.open_next()
+    crawler.recorder.close()
+    info = warc_archive.read_info(crawler.recorder.path)
+    assert info['tier'] == 'discovery'
+    assert json.loads(info['tier-rules']) == [['/pricing', 'full']]
+    assert json.loads(info['promote-keywords']) == ['Login']
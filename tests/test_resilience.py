@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+
+import pytest
+
+import resilience
+from resilience import (CircuitBreaker, CircuitOpenError, HostTimeouts, ResilientSession, RetryPolicy,
+                        parse_retry_after)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(resilience.time, 'sleep', clock.sleep)
+    return clock
+
+def test_backoff_is_bounded_by_the_exponential_cap(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: bounds.append((low, high)) or high)
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=3.0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    assert all(low == 0 for low, _ in bounds)
+
+def test_retry_after_overrides_backoff_up_to_the_maximum():
+    policy = RetryPolicy(backoff_max=8.0)
+    assert policy.delay(1, retry_after=2.0) == 2.0
+    assert policy.delay(1, retry_after=120.0) == 8.0
+
+def test_parse_retry_after():
+    assert parse_retry_after('5') == 5.0
+    assert parse_retry_after('-3') == 0.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') is None
+    assert parse_retry_after(None) is None
+
+def test_timeouts_use_the_default_until_enough_samples():
+    timeouts = HostTimeouts(default=7.0, maximum=10.0, min_samples=3)
+    timeouts.record('a', 0.1)
+    timeouts.record('a', 0.1)
+    assert timeouts.timeout_for('a') == 7.0
+    assert timeouts.timeout_for('b') == 7.0
+
+def test_timeouts_follow_the_latency_percentile():
+    timeouts = HostTimeouts(minimum=0.5, maximum=10.0, percentile=0.95, multiplier=3.0, min_samples=5)
+    for latency in [0.1] * 18 + [1.0, 2.0]:
+        timeouts.record('a', latency)
+    # The 95th percentile of 20 samples is the 20th smallest: 2.0s
+    assert timeouts.timeout_for('a') == pytest.approx(6.0)
+
+    fast = HostTimeouts(minimum=0.5, min_samples=1)
+    fast.record('b', 0.01)
+    assert fast.timeout_for('b') == 0.5
+    slow = HostTimeouts(maximum=4.0, min_samples=1)
+    slow.record('c', 9.0)
+    assert slow.timeout_for('c') == 4.0
+
+def test_timeouts_only_keep_a_window_of_samples():
+    timeouts = HostTimeouts(minimum=0.1, maximum=100.0, multiplier=1.0, min_samples=1, window=3)
+    for latency in (50.0, 1.0, 1.0, 1.0):
+        timeouts.record('a', latency)
+    assert timeouts.timeout_for('a') == 1.0
+
+def test_breaker_opens_after_the_failure_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow() == 0
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    assert breaker.allow() == pytest.approx(20.0)
+
+def test_breaker_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_breaker_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0, probe_wait=2.0)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow() == 0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() == 2.0
+    assert breaker.allow() == 2.0
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() == 0
+    assert breaker.allow() == 0
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=5, cooldown=30.0)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow() == 0
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() == pytest.approx(30.0)
+
+def test_probe_that_never_reports_back_expires(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow() == 0
+    clock.now += 29
+    assert breaker.allow() > 0
+    clock.now += 1
+    assert breaker.allow() == 0
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.headers = {}
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        return SimpleNamespace(status_code=status, headers={'Retry-After': '4'} if status == 503 else {}, history=[])
+
+def test_session_retries_after_the_retry_after_delay(clock):
+    fake = FakeSession([503, 503, 200])
+    session = ResilientSession(fake, retry_policy=RetryPolicy(max_retries=3))
+    start = clock.now
+    assert session.get('https://example.com/a').status_code == 200
+    assert fake.calls == 3
+    assert clock.now - start == pytest.approx(8.0)
+
+def test_session_stops_retrying_once_the_breaker_opens(clock):
+    fake = FakeSession([503, 503, 200])
+    session = ResilientSession(fake, retry_policy=RetryPolicy(max_retries=3), failure_threshold=2, cooldown=30.0)
+    assert session.get('https://example.com/a').status_code == 503
+    assert fake.calls == 2
+
+    with pytest.raises(CircuitOpenError) as error:
+        session.get('https://example.com/b')
+    assert error.value.host == 'example.com'
+    assert error.value.retry_in == pytest.approx(30.0)
+    assert fake.calls == 2
+
+    clock.now += 30
+    assert session.get('https://example.com/b').status_code == 200
+    assert session.breaker_for('example.com').state == CircuitBreaker.CLOSED
@@ -0,0 +1,88 @@
+from web_crawler import WebsiteCrawler, finish_structure_analysis, analyze_page_structure, new_structure_analysis
+
+SITE_HEADER = ('<header class="site"><nav class="main-nav"><a href="/">Home</a><a href="/about">About</a>'
+               '<a href="/pricing">Pricing</a><a href="/login">Log in</a></nav></header>')
+SITE_FOOTER = '<footer><a class="btn" href="/contact">Contact us</a></footer>'
+
+def page(body, header=SITE_HEADER):
+    return f'<html><head><title>Plans</title></head><body>{header}{body}{SITE_FOOTER}</body></html>'
+
+def article(button_text):
+    return (f'<article><header class="plan"><h2>Plan</h2><button class="btn">{button_text}</button></header>'
+            '<p>Details of the plan.</p></article>')
+
+def crawl(crawler, pages):
+    """Extract and resolve pages in crawl order, as crawl_page does"""
+    results = []
+    for url, html in pages:
+        page_data = crawler.extract_page_data(url, html)
+        crawler.resolve_templates(url, page_data)
+        crawler.pages_data[url] = page_data
+        results.append(page_data)
+    return results
+
+def button_texts(page_data):
+    return [button['text'] for button in page_data['buttons']]
+
+def analyze(crawler):
+    analysis = new_structure_analysis()
+    for url, page_data in crawler.pages_data.items():
+        analyze_page_structure(url, page_data, analysis)
+    return finish_structure_analysis(analysis, crawler.templates)
+
+def test_block_becomes_a_template_on_its_second_page(tmp_path):
+    crawler = WebsiteCrawler('https://example.com/', output_dir=str(tmp_path))
+    first, second, third = crawl(crawler, [
+        ('https://example.com/a', page('<p>A</p>')),
+        ('https://example.com/b', page('<p>B</p>')),
+        ('https://example.com/c', page('<p>C</p>')),
+    ])
+
+    # Seen once: kept on the page
+    assert first['templates'] == []
+    assert 'Contact us' in button_texts(first)
+    assert [nav['text'] for nav in first['navigation']] == ['Home', 'About', 'Pricing', 'Log in']
+
+    assert len(crawler.templates) == 2
+    assert all(template['first_url'] == 'https://example.com/a' for template in crawler.templates.values())
+    for page_data in (second, third):
+        assert sorted(page_data['templates']) == sorted(crawler.templates)
+        assert page_data['navigation'] == [] and page_data['buttons'] == []
+        assert 'template_blocks' not in page_data
+
+def test_blocks_inside_articles_stay_on_the_page(tmp_path):
+    crawler = WebsiteCrawler('https://example.com/', output_dir=str(tmp_path))
+    gold, silver = crawl(crawler, [
+        ('https://example.com/gold', page(article('Buy Gold Plan'))),
+        ('https://example.com/silver', page(article('Register for Silver'))),
+    ])
+    assert 'Buy Gold Plan' in button_texts(gold)
+    assert 'Register for Silver' in button_texts(silver)
+
+    analysis = analyze(crawler)
+    assert analysis['has_signup']
+    assert {'https://example.com/silver'} == {
+        item['url'] for item in analysis['potential_functionality'] if item['element']['text'] == 'Register for Silver'
+    }
+
+def test_fingerprint_covers_link_and_button_text(tmp_path):
+    crawler = WebsiteCrawler('https://example.com/', output_dir=str(tmp_path))
+    one, two = crawl(crawler, [
+        ('https://example.com/one', page('', header='<header><button class="btn">Buy Gold Plan</button></header>')),
+        ('https://example.com/two', page('', header='<header><button class="btn">Register  for\nSilver</button></header>')),
+    ])
+    assert button_texts(one)[0] == 'Buy Gold Plan'
+    assert ' '.join(button_texts(two)[0].split()) == 'Register for Silver'
+    # Only the shared footer repeated
+    assert [template['buttons'][0]['text'] for template in crawler.templates.values()] == ['Contact us']
+
+def test_repeats_on_the_same_page_do_not_make_a_template(tmp_path):
+    crawler = WebsiteCrawler('https://example.com/', output_dir=str(tmp_path))
+    crawl(crawler, [('https://example.com/a', page('<p>A</p>')), ('https://example.com/a', page('<p>A</p>'))])
+    assert crawler.templates == {}
+
+def test_without_templates_blocks_stay_on_every_page(tmp_path):
+    crawler = WebsiteCrawler('https://example.com/', output_dir=str(tmp_path), use_templates=False)
+    pages = crawl(crawler, [('https://example.com/a', page('<p>A</p>')), ('https://example.com/b', page('<p>B</p>'))])
+    assert crawler.templates == {}
+    assert all('Contact us' in button_texts(page_data) and page_data['templates'] == [] for page_data in pages)
@@ -0,0 +1,97 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import web_crawler
+from web_crawler import WebsiteCrawler
+
+BASE_URL = 'https://example.com/'
+
+PAGES = {
+    'https://example.com/': '<html><head><title>Home</title></head><body>'
+                            '<a href="/about">About</a><a href="/members">Members</a></body></html>',
+    'https://example.com/about': '<html><head><title>About us</title></head><body><h1>About</h1></body></html>',
+    'https://example.com/members': '<html><head><title>Member Login</title></head><body>'
+                                   '<h1>Members</h1><a href="/extra">Extra</a></body></html>',
+    'https://example.com/extra': '<html><head><title>Extra</title></head><body></body></html>',
+}
+
+class FakeSession:
+    """Serves PAGES and records the URLs requested"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        html = PAGES.get(url)
+        if html is None:
+            return SimpleNamespace(status_code=404, text='', content=b'')
+        return SimpleNamespace(status_code=200, text=html, content=html.encode('utf-8'))
+
+@pytest.fixture(autouse=True)
+def no_politeness_delay(monkeypatch):
+    monkeypatch.setattr(web_crawler.time, 'sleep', lambda seconds: None)
+
+def make_crawler(tmp_path, **kwargs):
+    crawler = WebsiteCrawler(BASE_URL, output_dir=str(tmp_path), **kwargs)
+    crawler.session = FakeSession()
+    return crawler
+
+def test_first_matching_rule_picks_the_tier(tmp_path):
+    crawler = make_crawler(tmp_path, tier='metadata', tier_rules=[('/blog/', 'discovery'), ('/blog/pricing', 'full')])
+    assert crawler.tier_for('https://example.com/blog/pricing') == 'discovery'
+    assert crawler.tier_for('https://example.com/pricing') == 'metadata'
+
+def test_promote_only_queues_richer_tiers_once(tmp_path):
+    crawler = make_crawler(tmp_path)
+    crawler.promote('https://example.com/never-crawled')
+    assert not crawler.promotions
+
+    crawler.page_tiers['https://example.com/a'] = 'metadata'
+    crawler.promote('https://example.com/a', 'discovery')
+    crawler.promote('https://example.com/a', 'full')
+    crawler.promote('https://example.com/a', 'full')
+    assert list(crawler.promotions) == [('https://example.com/a', 'full')]
+    # The tier only changes once the page has been extracted again
+    assert crawler.page_tiers['https://example.com/a'] == 'metadata'
+
+def test_failed_promotion_keeps_the_lower_tier(tmp_path, monkeypatch):
+    crawler = make_crawler(tmp_path, tier='metadata', promote_keywords=['login'])
+    crawler.crawl_page('https://example.com/members', 0)
+    assert list(crawler.promotions) == [('https://example.com/members', 'full')]
+
+    monkeypatch.delitem(PAGES, 'https://example.com/members')
+    url, tier = crawler.promotions.popleft()
+    assert crawler.crawl_page(url, 0, tier) is None
+    assert crawler.page_tiers['https://example.com/members'] == 'metadata'
+
+def test_promotion_rewrites_the_page_file_at_full_tier(tmp_path):
+    crawler = make_crawler(tmp_path, tier='metadata', promote_keywords=['login'])
+    crawler.crawl(max_pages=4)
+
+    assert crawler.page_tiers == {
+        'https://example.com/': 'metadata',
+        'https://example.com/about': 'metadata',
+        'https://example.com/members': 'full',
+        'https://example.com/extra': 'metadata',
+    }
+    # The promoted page was fetched again and kept its page number
+    assert crawler.session.requested.count('https://example.com/members') == 2
+    with open(tmp_path / '2__members.json', encoding='utf-8') as f:
+        assert json.load(f)['tier'] == 'full'
+
+def test_promotions_are_drained_after_the_page_budget(tmp_path):
+    crawler = make_crawler(tmp_path, tier='metadata', promote_keywords=['login'], tier_rules=[('/about', 'discovery')])
+    # /members is the last page the budget allows
+    crawler.crawl(max_pages=3)
+    assert crawler.page_tiers['https://example.com/members'] == 'full'
+    assert not crawler.promotions
+    assert 'https://example.com/extra' not in crawler.session.requested
+
+def test_url_mentioning_a_keyword_is_extracted_at_full_tier_at_once(tmp_path):
+    crawler = make_crawler(tmp_path, tier='discovery', promote_keywords=['members'])
+    crawler.crawl(max_pages=3)
+    assert crawler.page_tiers['https://example.com/members'] == 'full'
+    assert crawler.session.requested.count('https://example.com/members') == 1
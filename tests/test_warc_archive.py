@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import warc_archive
+
+def fake_response(url, status_code=200, body=b'<html>ok</html>', headers=None, reason='OK'):
+    return SimpleNamespace(
+        url=url,
+        status_code=status_code,
+        reason=reason,
+        headers=headers or {'Content-Type': 'text/html; charset=utf-8'},
+        content=body,
+        raw=SimpleNamespace(version=11),
+    )
+
+def write(directory, responses, **kwargs):
+    writer = warc_archive.WarcWriter(str(directory), **kwargs)
+    for response in responses:
+        writer.write_response(response)
+    writer.close()
+
+def test_round_trip_preserves_responses(tmp_path):
+    body = 'Grüße <a href="/next">next</a>'.encode('utf-8')
+    write(tmp_path, [
+        fake_response('https://example.com/', body=body, headers={
+            'Content-Type': 'text/html; charset=utf-8',
+            'Content-Encoding': 'gzip',
+        }),
+        fake_response('https://example.com/missing', status_code=404, body=b'', reason='Not Found'),
+    ], info={'base-url': 'https://example.com/'})
+
+    paths = warc_archive.find_archives(str(tmp_path))
+    assert len(paths) == 1
+    assert warc_archive.read_info(paths[0])['base-url'] == 'https://example.com/'
+
+    first, second = warc_archive.iter_responses(paths[0])
+    assert (first.url, first.status_code, first.reason, first.body) == ('https://example.com/', 200, 'OK', body)
+    assert first.headers['content-type'] == 'text/html; charset=utf-8'
+    # The body is stored decoded, so the wire encoding is kept under another name
+    assert 'content-encoding' not in first.headers
+    assert first.headers['x-archive-orig-content-encoding'] == 'gzip'
+    assert first.headers['content-length'] == str(len(body))
+    assert (second.status_code, second.reason, second.body) == (404, 'Not Found', b'')
+
+def test_records_carry_payload_digest(tmp_path):
+    write(tmp_path, [fake_response('https://example.com/', body=b'payload')])
+    path, = warc_archive.find_archives(str(tmp_path))
+    records = list(warc_archive.iter_records(path))
+    assert [headers['warc-type'] for headers, _ in records] == ['warcinfo', 'response']
+    assert records[1][0]['warc-payload-digest'] == warc_archive.sha1_digest(b'payload')
+
+def test_writer_rolls_over_to_new_files(tmp_path):
+    write(tmp_path, [fake_response(f'https://example.com/{i}', body=b'x' * 200) for i in range(3)], max_size=1)
+    paths = warc_archive.find_archives(str(tmp_path))
+    assert len(paths) == 3
+    urls = [response.url for path in paths for response in warc_archive.iter_responses(path)]
+    assert urls == [f'https://example.com/{i}' for i in range(3)]
+
+def test_find_archives_filters_by_prefix(tmp_path):
+    write(tmp_path, [fake_response('https://example.com/a')], prefix='crawl')
+    write(tmp_path, [fake_response('https://example.com/b')], prefix='focused')
+    (tmp_path / 'notes.txt').write_text('not an archive')
+    assert len(warc_archive.find_archives(str(tmp_path))) == 2
+    focused, = warc_archive.find_archives(str(tmp_path), prefix='focused')
+    assert [response.url for response in warc_archive.iter_responses(focused)] == ['https://example.com/b']
+
+def test_fetches_are_reported_under_the_requested_url(tmp_path):
+    write(tmp_path, [
+        fake_response('https://example.com/old', status_code=301, body=b'', reason='Moved Permanently'),
+        fake_response('https://example.com/older', status_code=302, body=b'', reason='Found'),
+        fake_response('https://example.com/new'),
+        fake_response('https://example.com/plain'),
+    ])
+    fetches = [(url, response.url) for url, response in
+               warc_archive.iter_fetches(warc_archive.find_archives(str(tmp_path)))]
+    assert fetches == [
+        ('https://example.com/old', 'https://example.com/new'),
+        ('https://example.com/plain', 'https://example.com/plain'),
+    ]
+
+def test_rolled_files_share_the_writer_run(tmp_path):
+    writer = warc_archive.WarcWriter(str(tmp_path), max_size=1)
+    for i in range(3):
+        writer.write_response(fake_response(f'https://example.com/{i}'))
+    writer.close()
+    paths = warc_archive.find_archives(str(tmp_path))
+    assert {warc_archive.archive_run(path) for path in paths} == {writer.run}
+    assert warc_archive.select_run(paths) == paths
+
+def test_select_run_keeps_one_crawl(tmp_path):
+    older = warc_archive.WarcWriter(str(tmp_path), max_size=1)
+    newer = warc_archive.WarcWriter(str(tmp_path), max_size=1)
+    assert newer.run > older.run
+    for writer, url in ((older, 'https://example.com/old'), (newer, 'https://example.com/new')):
+        for _ in range(2):
+            writer.write_response(fake_response(url))
+        writer.close()
+
+    paths = warc_archive.find_archives(str(tmp_path))
+    assert len(paths) == 4
+    latest = warc_archive.select_run(paths)
+    assert {response.url for path in latest for response in warc_archive.iter_responses(path)} == {'https://example.com/new'}
+    chosen = warc_archive.select_run(paths, older.run)
+    assert {response.url for path in chosen for response in warc_archive.iter_responses(path)} == {'https://example.com/old'}
+    assert warc_archive.select_run(paths, 'no-such-run') == []
+    assert warc_archive.select_run([]) == []
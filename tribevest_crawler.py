@@ -1,71 +1,91 @@
-import requests
-import trafilatura
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import time
 import json
 import os
-from bs4 import BeautifulSoup
+from link_extractor import extract_links
+from resilience import CircuitOpenError, ResilientSession
+import warc_archive
+from web_crawler import MAX_CIRCUIT_WAITS, decode_body
 
-def crawl_tribevest():
+DEFAULT_BASE_URL = "https://www.tribevest.com/"
+
+# File name prefix of the WARC files written by crawl_tribevest
+WARC_PREFIX = 'tribevest'
+
+def extract_page_record(url, html):
+    """Return the title, meta description and main text content of a page"""
+    import trafilatura
+    from bs4 import BeautifulSoup
+
+    # Extract main content using trafilatura
+    text_content = trafilatura.extract(html)
+    
+    # Also get page title and meta description using BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else "No title"
+    
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    description = meta_desc.get('content', '').strip() if meta_desc else "No description"
+    
+    return {
+        'url': url,
+        'title': title_text,
+        'description': description,
+        'content': text_content if text_content else "No content extracted",
+        'status': 'success'
+    }
+
+def error_record(url, error):
+    return {
+        'url': url,
+        'title': "Error",
+        'description': "Failed to crawl",
+        'content': f"Error: {error}",
+        'status': 'error'
+    }
+
+def crawl_tribevest(base_url=DEFAULT_BASE_URL, max_pages=20, warc_dir=None):
     """
     Crawl Tribevest website to analyze their platform features and content
     """
-    base_url = "https://www.tribevest.com/"
+    import requests
+
+    site_domain = urlparse(base_url).netloc.replace('www.', '')
     crawled_data = {}
     visited_urls = set()
     
     # Headers to appear as a regular browser
-    headers = {
+    recorder = warc_archive.WarcWriter(warc_dir, prefix=WARC_PREFIX, info={'base-url': base_url}) if warc_dir else None
+    session = ResilientSession(requests.Session(), recorder=recorder)
+    session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    })
     
     def get_page_content(url):
-        """Extract main text content from a URL"""
+        """Extract main text content from a URL, returning the page data and raw body"""
         try:
             print(f"Crawling: {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = session.get(url)
             response.raise_for_status()
-            
-            # Extract main content using trafilatura
-            text_content = trafilatura.extract(response.text)
-            
-            # Also get page title and meta description using BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else "No title"
-            
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            description = meta_desc.get('content', '').strip() if meta_desc else "No description"
-            
-            return {
-                'url': url,
-                'title': title_text,
-                'description': description,
-                'content': text_content if text_content else "No content extracted",
-                'status': 'success'
-            }
+            return extract_page_record(url, response.text), response.content
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"Error crawling {url}: {str(e)}")
-            return {
-                'url': url,
-                'title': "Error",
-                'description': "Failed to crawl",
-                'content': f"Error: {str(e)}",
-                'status': 'error'
-            }
-    
-    def find_internal_links(url, html_content):
-        """Find internal links on a page"""
+            return error_record(url, e), None
+    
+    def find_internal_links(url, body):
+        """Find internal links in an already downloaded page body"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links = set()
+            _, page_links = extract_links(body, url)
+            links = {}
             
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                full_url = urljoin(url, href)
+            for link in page_links:
+                full_url = link.url
                 
-                # Only include tribevest.com links
-                if 'tribevest.com' in full_url and full_url not in visited_urls:
+                # Only include links on the crawled site
+                if site_domain in full_url and full_url not in visited_urls:
                     # Filter out common non-content URLs
                     if not any(skip in full_url.lower() for skip in [
                         'mailto:', 'tel:', '#', 'javascript:', 
@@ -73,17 +93,17 @@ def crawl_tribevest():
                         '/wp-admin', '/wp-content', '/feed',
                         'facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com'
                     ]):
-                        links.add(full_url)
+                        links[full_url] = True
             
-            return links
+            return list(links)
         except Exception as e:
             print(f"Error finding links: {str(e)}")
-            return set()
+            return []
     
     # Start with the main page
     urls_to_visit = [base_url]
-    max_pages = 20  # Limit to prevent excessive crawling
     pages_crawled = 0
+    circuit_waits = 0
     
     while urls_to_visit and pages_crawled < max_pages:
         current_url = urls_to_visit.pop(0)
@@ -94,15 +114,26 @@ def crawl_tribevest():
         visited_urls.add(current_url)
         
         # Get page content
-        page_data = get_page_content(current_url)
+        try:
+            page_data, body = get_page_content(current_url)
+        except CircuitOpenError as e:
+            # The host keeps failing: put the URL back and wait for the breaker's probe
+            circuit_waits += 1
+            if circuit_waits > MAX_CIRCUIT_WAITS:
+                print(f"Giving up on {site_domain}: {e}")
+                break
+            visited_urls.discard(current_url)
+            urls_to_visit.insert(0, current_url)
+            time.sleep(e.retry_in)
+            continue
+        circuit_waits = 0
         crawled_data[current_url] = page_data
         pages_crawled += 1
         
         # If successful, find more links to crawl
         if page_data['status'] == 'success' and pages_crawled < max_pages:
             try:
-                response = requests.get(current_url, headers=headers, timeout=10)
-                new_links = find_internal_links(current_url, response.text)
+                new_links = find_internal_links(current_url, body)
                 
                 # Add new links to visit (limit to most important pages)
                 priority_keywords = ['about', 'features', 'how-it-works', 'pricing', 'platform', 'invest', 'club']
@@ -123,13 +154,31 @@ def crawl_tribevest():
         
         print(f"Crawled {pages_crawled}/{max_pages} pages")
     
+    if recorder is not None:
+        recorder.close()
+    
     return crawled_data
 
-def analyze_tribevest_features(crawled_data):
-    """
-    Analyze the crawled data to extract key features and insights
-    """
-    analysis = {
+# Keywords to look for in content
+FEATURE_KEYWORDS = [
+    'investment club', 'group investing', 'real estate', 'stocks', 'portfolio',
+    'fund management', 'collective investing', 'social investing', 'tribe',
+    'investment strategy', 'risk management', 'returns', 'diversification'
+]
+
+BENEFIT_KEYWORDS = [
+    'transparent', 'easy', 'automated', 'professional', 'secure',
+    'low cost', 'accessible', 'democratic', 'collaborative'
+]
+
+TECH_KEYWORDS = [
+    'platform', 'app', 'mobile', 'web', 'API', 'integration',
+    'blockchain', 'crypto', 'fintech', 'banking'
+]
+
+def new_feature_analysis():
+    """Return an empty feature analysis"""
+    return {
         'key_features': [],
         'platform_benefits': [],
         'business_model': [],
@@ -137,64 +186,94 @@ def analyze_tribevest_features(crawled_data):
         'user_experience': [],
         'competitive_advantages': []
     }
+
+def analyze_page_features(page_data, analysis):
+    """Add the feature, benefit and technology mentions of one page to analysis"""
+    if page_data['status'] == 'success':
+        content = page_data['content'].lower()
+        title = page_data['title'].lower()
+        
+        # Extract features
+        for keyword in FEATURE_KEYWORDS:
+            if keyword in content or keyword in title:
+                analysis['key_features'].append(f"Found '{keyword}' mentioned in {page_data['title']}")
+        
+        # Extract benefits
+        for keyword in BENEFIT_KEYWORDS:
+            if keyword in content or keyword in title:
+                analysis['platform_benefits'].append(f"Emphasizes '{keyword}' in {page_data['title']}")
+        
+        # Extract tech info
+        for keyword in TECH_KEYWORDS:
+            if keyword in content or keyword in title:
+                analysis['technology_stack'].append(f"Uses '{keyword}' mentioned in {page_data['title']}")
     
-    # Keywords to look for in content
-    feature_keywords = [
-        'investment club', 'group investing', 'real estate', 'stocks', 'portfolio',
-        'fund management', 'collective investing', 'social investing', 'tribe',
-        'investment strategy', 'risk management', 'returns', 'diversification'
-    ]
-    
-    benefit_keywords = [
-        'transparent', 'easy', 'automated', 'professional', 'secure',
-        'low cost', 'accessible', 'democratic', 'collaborative'
-    ]
-    
-    tech_keywords = [
-        'platform', 'app', 'mobile', 'web', 'API', 'integration',
-        'blockchain', 'crypto', 'fintech', 'banking'
-    ]
+    return analysis
+
+def merge_feature_analysis(analysis, other):
+    """Append feature analysis other (covering later pages) to analysis"""
+    for key, items in other.items():
+        analysis[key].extend(items)
+    return analysis
+
+def analyze_tribevest_features(crawled_data):
+    """
+    Analyze the crawled data to extract key features and insights
+    """
+    analysis = new_feature_analysis()
     
     for url, page_data in crawled_data.items():
-        if page_data['status'] == 'success':
-            content = page_data['content'].lower()
-            title = page_data['title'].lower()
-            
-            # Extract features
-            for keyword in feature_keywords:
-                if keyword in content or keyword in title:
-                    analysis['key_features'].append(f"Found '{keyword}' mentioned in {page_data['title']}")
-            
-            # Extract benefits
-            for keyword in benefit_keywords:
-                if keyword in content or keyword in title:
-                    analysis['platform_benefits'].append(f"Emphasizes '{keyword}' in {page_data['title']}")
-            
-            # Extract tech info
-            for keyword in tech_keywords:
-                if keyword in content or keyword in title:
-                    analysis['technology_stack'].append(f"Uses '{keyword}' mentioned in {page_data['title']}")
+        analyze_page_features(page_data, analysis)
     
     return analysis
 
-if __name__ == "__main__":
-    print("Starting Tribevest website crawl...")
+def _replay_record(fetch):
+    """Rebuild the page data of one archived fetch"""
+    url, response = fetch
+    if response.status_code >= 400:
+        # Same message as the live crawl's raise_for_status()
+        kind = 'Client' if response.status_code < 500 else 'Server'
+        return error_record(url, f"{response.status_code} {kind} Error: {response.reason} for url: {response.url}")
+    return extract_page_record(url, decode_body(response.body, response.headers))
+
+def replay_archives(warc_dir, output_dir='crawled_data', workers=None, run=None):
+    """Rebuild the raw data, analysis and summary files from the WARC files of a feature crawl.
+
+    Only the archives of one crawl are replayed: the latest in warc_dir, or
+    the given run. Pages are extracted in a process pool. Pages whose fetch
+    failed before any response arrived were never archived and are missing
+    from the rebuilt data.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    warc_paths = warc_archive.select_run(warc_archive.find_archives(warc_dir, prefix=WARC_PREFIX), run)
+    if not warc_paths:
+        print(f"No feature crawl WARC files found in {warc_dir}")
+        return None
     
-    # Create directory for crawled data
-    os.makedirs('crawled_data', exist_ok=True)
+    fetches = {}
+    for url, response in warc_archive.iter_fetches(warc_paths):
+        fetches.setdefault(url, response)
     
-    # Crawl the website
-    crawled_data = crawl_tribevest()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        crawled_data = dict(zip(fetches, pool.map(_replay_record, fetches.items(), chunksize=4)))
     
+    os.makedirs(output_dir, exist_ok=True)
+    summary = save_results(crawled_data, output_dir)
+    print(f"Replay completed. Rebuilt {len(crawled_data)} pages from {len(warc_paths)} archive(s).")
+    return summary
+
+def save_results(crawled_data, output_dir):
+    """Analyze crawled pages and write raw data, analysis and summary files; return the summary"""
     # Save raw crawled data
-    with open('crawled_data/tribevest_raw_data.json', 'w', encoding='utf-8') as f:
+    with open(f'{output_dir}/tribevest_raw_data.json', 'w', encoding='utf-8') as f:
         json.dump(crawled_data, f, indent=2, ensure_ascii=False)
     
     # Analyze the data
     analysis = analyze_tribevest_features(crawled_data)
     
     # Save analysis
-    with open('crawled_data/tribevest_analysis.json', 'w', encoding='utf-8') as f:
+    with open(f'{output_dir}/tribevest_analysis.json', 'w', encoding='utf-8') as f:
         json.dump(analysis, f, indent=2, ensure_ascii=False)
     
     # Create summary report
@@ -206,17 +285,35 @@ if __name__ == "__main__":
         'analysis_summary': analysis
     }
     
-    with open('crawled_data/tribevest_summary.json', 'w', encoding='utf-8') as f:
+    with open(f'{output_dir}/tribevest_summary.json', 'w', encoding='utf-8') as f:
         json.dump(summary, f, indent=2, ensure_ascii=False)
     
+    return summary
+
+def main(base_url=DEFAULT_BASE_URL, max_pages=20, output_dir='crawled_data', warc_dir=None):
+    """Crawl the site, analyze its features and write raw data, analysis and summary files"""
+    print("Starting Tribevest website crawl...")
+    
+    # Create directory for crawled data
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Crawl the website
+    crawled_data = crawl_tribevest(base_url, max_pages=max_pages, warc_dir=warc_dir)
+    summary = save_results(crawled_data, output_dir)
+    
     print(f"\nCrawl completed!")
     print(f"Pages crawled: {len(crawled_data)}")
-    print(f"Successful: {len([p for p in crawled_data.values() if p['status'] == 'success'])}")
-    print(f"Failed: {len([p for p in crawled_data.values() if p['status'] == 'error'])}")
-    print(f"\nData saved to crawled_data/ directory")
+    print(f"Successful: {summary['successful_pages']}")
+    print(f"Failed: {summary['failed_pages']}")
+    print(f"\nData saved to {output_dir}/ directory")
     
     # Print quick summary
     print("\nPage titles crawled:")
     for url, data in crawled_data.items():
         if data['status'] == 'success':
-            print(f"- {data['title']}")
\ No newline at end of file
+            print(f"- {data['title']}")
+    
+    return summary
+
+if __name__ == "__main__":
+    main()
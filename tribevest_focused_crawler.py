@@ -1,66 +1,85 @@
-import requests
-import trafilatura
 import json
 import os
-from bs4 import BeautifulSoup
 import time
+from resilience import HostTimeouts, ResilientSession
+import warc_archive
+from web_crawler import decode_body
 
-def crawl_tribevest_focused():
+# File name prefix of the WARC files written by crawl_tribevest_focused
+WARC_PREFIX = 'focused'
+
+# Target specific important pages
+DEFAULT_TARGET_URLS = [
+    "https://www.tribevest.com/",
+    "https://www.tribevest.com/how-it-works",
+    "https://www.tribevest.com/features",
+    "https://www.tribevest.com/pricing",
+    "https://www.tribevest.com/about",
+    "https://www.tribevest.com/investor-groups",
+    "https://www.tribevest.com/business-account"
+]
+
+def extract_page_record(html):
+    """Return the title, meta description and main text content of a page"""
+    import trafilatura
+    from bs4 import BeautifulSoup
+
+    # Extract content
+    text_content = trafilatura.extract(html)
+    
+    # Get title and meta
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else "No title"
+    
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    description = meta_desc.get('content', '').strip() if meta_desc else ""
+    
+    return {
+        'title': title_text,
+        'description': description,
+        'content': text_content or "No content extracted",
+        'status': 'success'
+    }
+
+def failed_record(status_code):
+    return {
+        'title': "Access Failed",
+        'description': f"HTTP {status_code}",
+        'content': f"Failed to access - Status code: {status_code}",
+        'status': 'error'
+    }
+
+def crawl_tribevest_focused(target_urls=None, warc_dir=None):
     """
     Focused crawl of key Tribevest pages with shorter timeouts
     """
-    # Target specific important pages
-    target_urls = [
-        "https://www.tribevest.com/",
-        "https://www.tribevest.com/how-it-works",
-        "https://www.tribevest.com/features",
-        "https://www.tribevest.com/pricing",
-        "https://www.tribevest.com/about",
-        "https://www.tribevest.com/investor-groups",
-        "https://www.tribevest.com/business-account"
-    ]
+    import requests
+
+    if target_urls is None:
+        target_urls = DEFAULT_TARGET_URLS
     
     crawled_data = {}
     
-    headers = {
+    # Shorter timeouts: never wait more than 5 seconds on a page
+    recorder = warc_archive.WarcWriter(warc_dir, prefix=WARC_PREFIX, info={'base-url': target_urls[0]}) if warc_dir else None
+    session = ResilientSession(requests.Session(), timeouts=HostTimeouts(default=5.0, maximum=5.0), recorder=recorder)
+    session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
+    })
     
     for url in target_urls:
         try:
             print(f"Crawling: {url}")
             
-            # Shorter timeout
-            response = requests.get(url, headers=headers, timeout=5)
+            response = session.get(url)
             
             if response.status_code == 200:
-                # Extract content
-                text_content = trafilatura.extract(response.text)
-                
-                # Get title and meta
-                soup = BeautifulSoup(response.text, 'html.parser')
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else "No title"
-                
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                description = meta_desc.get('content', '').strip() if meta_desc else ""
-                
-                crawled_data[url] = {
-                    'title': title_text,
-                    'description': description,
-                    'content': text_content or "No content extracted",
-                    'status': 'success'
-                }
-                
-                print(f"✓ Successfully crawled: {title_text}")
+                crawled_data[url] = extract_page_record(response.text)
+                print(f"✓ Successfully crawled: {crawled_data[url]['title']}")
             else:
                 print(f"✗ Failed to access {url} - Status: {response.status_code}")
-                crawled_data[url] = {
-                    'title': "Access Failed",
-                    'description': f"HTTP {response.status_code}",
-                    'content': f"Failed to access - Status code: {response.status_code}",
-                    'status': 'error'
-                }
+                crawled_data[url] = failed_record(response.status_code)
                 
         except Exception as e:
             print(f"✗ Error crawling {url}: {str(e)}")
@@ -74,19 +93,57 @@ def crawl_tribevest_focused():
         # Short delay between requests
         time.sleep(0.5)
     
+    if recorder is not None:
+        recorder.close()
+    
     return crawled_data
 
-if __name__ == "__main__":
+def _replay_record(response):
+    """Rebuild the page data of one archived response"""
+    if response.status_code == 200:
+        return extract_page_record(decode_body(response.body, response.headers))
+    return failed_record(response.status_code)
+
+def replay_archives(warc_dir, output_dir='crawled_data', workers=None, run=None):
+    """Rebuild tribevest_focused_data.json from the WARC files of a focused crawl.
+
+    Only the archives of one crawl are replayed: the latest in warc_dir, or
+    the given run. Pages are extracted in a process pool. Pages whose fetch
+    failed before any response arrived were never archived and are missing
+    from the rebuilt data.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    warc_paths = warc_archive.select_run(warc_archive.find_archives(warc_dir, prefix=WARC_PREFIX), run)
+    if not warc_paths:
+        print(f"No focused crawl WARC files found in {warc_dir}")
+        return None
+    
+    # A URL listed twice is fetched twice; as in the live crawl the last fetch wins
+    fetches = dict(warc_archive.iter_fetches(warc_paths))
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        crawled_data = dict(zip(fetches, pool.map(_replay_record, fetches.values(), chunksize=4)))
+    
+    os.makedirs(output_dir, exist_ok=True)
+    with open(f'{output_dir}/tribevest_focused_data.json', 'w', encoding='utf-8') as f:
+        json.dump(crawled_data, f, indent=2, ensure_ascii=False)
+    
+    print(f"Replay completed. Rebuilt {len(crawled_data)} pages from {len(warc_paths)} archive(s).")
+    return crawled_data
+
+def main(target_urls=None, output_dir='crawled_data', warc_dir=None):
+    """Run the focused crawl and save the results to tribevest_focused_data.json"""
     print("Starting focused Tribevest crawl...")
     
     # Create directory for crawled data
-    os.makedirs('crawled_data', exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
     
     # Crawl the website
-    crawled_data = crawl_tribevest_focused()
+    crawled_data = crawl_tribevest_focused(target_urls, warc_dir=warc_dir)
     
     # Save the data
-    with open('crawled_data/tribevest_focused_data.json', 'w', encoding='utf-8') as f:
+    with open(f'{output_dir}/tribevest_focused_data.json', 'w', encoding='utf-8') as f:
         json.dump(crawled_data, f, indent=2, ensure_ascii=False)
     
     # Print summary
@@ -103,4 +160,9 @@ if __name__ == "__main__":
         if data['status'] == 'success':
             print(f"- {data['title']}")
     
-    print(f"\nData saved to crawled_data/tribevest_focused_data.json")
\ No newline at end of file
+    print(f"\nData saved to {output_dir}/tribevest_focused_data.json")
+    
+    return crawled_data
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Minimal WARC 1.0 writer and reader for recording crawler responses.
+
+WarcWriter appends one gzip member per record (the usual .warc.gz layout), so
+archives can be read by standard WARC tools as well as by iter_responses
+below. Only the standard library is used.
+
+Files are named <prefix>-<run>-<serial>.warc.gz, where run is the time the
+writer was created. Several crawls can share a directory; select_run picks
+the files of one of them.
+"""
+
+import base64
+from collections import namedtuple
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import io
+import os
+import uuid
+
+WARC_VERSION = b'WARC/1.0'
+
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+
+# Headers that describe the wire encoding rather than the decoded body we store
+WIRE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+ArchivedResponse = namedtuple('ArchivedResponse', ['url', 'status_code', 'headers', 'body', 'date', 'reason'])
+
+def new_run():
+    """Return a run id for the files of one crawl: the current time, sortable"""
+    return datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+
+def warc_date():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def sha1_digest(data):
+    return 'sha1:' + base64.b32encode(hashlib.sha1(data).digest()).decode('ascii')
+
+class WarcWriter:
+    """Write responses into rolling .warc.gz files in a directory"""
+
+    def __init__(self, directory, prefix='crawl', max_size=1024 * 1024 * 1024, info=None, run=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_size = max_size
+        self.info = info or {}
+        self.run = run or new_run()
+        self.serial = 0
+        self.file = None
+        self.path = None
+        os.makedirs(directory, exist_ok=True)
+
+    def open_next(self):
+        self.close()
+        self.path = os.path.join(self.directory, f"{self.prefix}-{self.run}-{self.serial:05d}.warc.gz")
+        self.serial += 1
+        self.file = open(self.path, 'wb')
+        fields = {'software': 'AXIOM web crawler', 'format': 'WARC File Format 1.0'}
+        fields.update(self.info)
+        block = ''.join(f"{k}: {v}\r\n" for k, v in fields.items()).encode('utf-8')
+        self.write_record('warcinfo', block, 'application/warc-fields', {'WARC-Filename': os.path.basename(self.path)})
+
+    def write_record(self, warc_type, block, content_type, extra_headers=None):
+        headers = [
+            ('WARC-Type', warc_type),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', warc_date()),
+        ]
+        headers.extend((extra_headers or {}).items())
+        headers.append(('Content-Type', content_type))
+        headers.append(('Content-Length', str(len(block))))
+
+        record = io.BytesIO()
+        record.write(WARC_VERSION + b'\r\n')
+        for name, value in headers:
+            record.write(f"{name}: {value}\r\n".encode('utf-8'))
+        record.write(b'\r\n')
+        record.write(block)
+        record.write(b'\r\n\r\n')
+        self.file.write(gzip.compress(record.getvalue()))
+
+    def write_response(self, response):
+        """Record a requests.Response (status line, headers and decoded body)"""
+        if self.file is None or self.file.tell() >= self.max_size:
+            self.open_next()
+
+        body = response.content
+        version = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}.get(getattr(response.raw, 'version', 11), 'HTTP/1.1')
+        lines = [f"{version} {response.status_code} {response.reason or ''}".rstrip()]
+        for name, value in response.headers.items():
+            if name.lower() in WIRE_HEADERS:
+                # The body is stored decoded, so keep the original values under another name
+                name = 'X-Archive-Orig-' + name
+            lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(body)}")
+        http_head = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8', 'replace')
+
+        self.write_record('response', http_head + body, 'application/http; msgtype=response', {
+            'WARC-Target-URI': response.url,
+            'WARC-Payload-Digest': sha1_digest(body),
+        })
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def open_archive(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def iter_records(path):
+    """Yield (headers, block) for each record in a .warc or .warc.gz file"""
+    with open_archive(path) as f:
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b'WARC/'):
+                raise ValueError(f"Malformed WARC record in {path}: {line[:40]!r}")
+
+            headers = {}
+            for line in iter(f.readline, b'\r\n'):
+                if not line:
+                    break
+                name, _, value = line.decode('utf-8', 'replace').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            block = f.read(int(headers.get('content-length', 0)))
+            yield headers, block
+
+def read_info(path):
+    """Return the fields of the first warcinfo record in path"""
+    for headers, block in iter_records(path):
+        if headers.get('warc-type') == 'warcinfo':
+            fields = {}
+            for line in block.decode('utf-8', 'replace').splitlines():
+                name, sep, value = line.partition(':')
+                if sep:
+                    fields[name.strip()] = value.strip()
+            return fields
+        break
+    return {}
+
+def iter_responses(path):
+    """Yield an ArchivedResponse for each response record in path"""
+    for headers, block in iter_records(path):
+        if headers.get('warc-type') != 'response':
+            continue
+        head, _, body = block.partition(b'\r\n\r\n')
+        head_lines = head.decode('utf-8', 'replace').split('\r\n')
+        status_parts = head_lines[0].split(' ', 2)
+        status_code = int(status_parts[1]) if len(status_parts) > 1 else 0
+        reason = status_parts[2] if len(status_parts) > 2 else ''
+        http_headers = {}
+        for line in head_lines[1:]:
+            name, _, value = line.partition(':')
+            http_headers[name.strip().lower()] = value.strip()
+        yield ArchivedResponse(headers.get('warc-target-uri', ''), status_code, http_headers, body,
+                               headers.get('warc-date', ''), reason)
+
+def iter_fetches(paths):
+    """Yield (requested_url, response) for each final response in paths.
+
+    Redirect hops are recorded before the response they lead to, so the
+    final response is reported under the URL that was originally requested.
+    """
+    origin = None
+    for path in paths:
+        for response in iter_responses(path):
+            if response.status_code in REDIRECT_STATUS_CODES:
+                if origin is None:
+                    origin = response.url
+                continue
+            yield origin or response.url, response
+            origin = None
+
+def find_archives(directory, prefix=None):
+    """Return the WARC files in directory in the order they were written, optionally only those with prefix"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if (name.endswith('.warc') or name.endswith('.warc.gz'))
+        and (prefix is None or name.startswith(prefix + '-'))
+    )
+
+def archive_run(path):
+    """Return the run id in an archive's file name"""
+    return os.path.basename(path).split('-')[-2]
+
+def select_run(paths, run=None):
+    """Return the archives among paths written by one crawl, the latest unless run is given"""
+    runs = {}
+    for path in paths:
+        runs.setdefault(archive_run(path), []).append(path)
+    if not runs:
+        return []
+    return runs.get(run or max(runs), [])
@@ -1,18 +1,109 @@
-import requests
-from bs4 import BeautifulSoup
-import trafilatura
+from collections import deque
 import json
 import os
+import re
 from urllib.parse import urljoin, urlparse
 import time
+from link_extractor import extract_links
+from near_duplicates import NearDuplicateIndex
+from resilience import CircuitOpenError, ResilientSession
+import warc_archive
+
+DEFAULT_BASE_URL = "https://www.tribevest.com/"
+
+# File name prefix of the WARC files written by WebsiteCrawler
+WARC_PREFIX = 'crawl'
+
+# Extraction tiers from cheapest to richest:
+#   discovery - links only, from a tokenizer scan without a DOM
+#   metadata  - links plus title, meta description and headings
+#   full      - everything, including trafilatura content, forms, navigation and buttons
+TIERS = ['discovery', 'metadata', 'full']
+
+# Consecutive open-circuit waits without a crawled page before a host is given up
+MAX_CIRCUIT_WAITS = 3
+
+def is_nav_container(tag):
+    """Check if tag is a nav/ul/div whose class mentions nav or menu"""
+    if tag.name not in ('nav', 'ul', 'div'):
+        return False
+    classes = tag.get('class') or []
+    if isinstance(classes, str):
+        classes = [classes]
+    return any('nav' in c.lower() or 'menu' in c.lower() for c in classes)
+
+def is_template_block(tag):
+    """Check if tag is a block that usually repeats on every page of a site"""
+    return tag.name in ('header', 'footer', 'nav') or is_nav_container(tag)
+
+def normalize_text(text):
+    return ' '.join(text.split()).lower()
+
+def fingerprint_block(host, block):
+    """Return a template id for block based on its structure, link targets and link/button text"""
+    import hashlib
+
+    parts = [host, block.name, ' '.join(block.get('class') or [])]
+    for tag in block.find_all(['a', 'button']):
+        parts.append(f"{tag.name}|{tag.get('href', '')}|{tag.get('id', '')}|{' '.join(tag.get('class') or [])}"
+                     f"|{normalize_text(tag.get_text(' '))}")
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:16]
 
 class WebsiteCrawler:
-    def __init__(self, base_url, output_dir="crawled_data"):
+    def __init__(self, base_url, output_dir="crawled_data", warc_dir=None, use_templates=True,
+                 dedup_threshold=None, dedup_mode='mark', tier='full', tier_rules=None,
+                 promote_keywords=None, warc_run=None):
+        import requests
+
         self.base_url = base_url
         self.visited_urls = set()
         self.pages_data = {}
         self.output_dir = output_dir
-        self.session = requests.Session()
+        # Per-page file name by url, listed in crawl_summary.json so that
+        # analysis ignores files left over from earlier crawls
+        self.page_files = {}
+        
+        # Shared page blocks by template id, see extract_template_blocks and
+        # resolve_templates. A block seen on one page so far is only a
+        # candidate: {template_id: first_url}
+        self.use_templates = use_templates
+        self.templates = {}
+        self.template_candidates = {}
+        
+        # Near-duplicate detection on main_content: 'mark' saves the page but
+        # leaves it out of the analysis and does not follow its links, 'skip'
+        # drops it entirely
+        self.dedup_index = NearDuplicateIndex(dedup_threshold) if dedup_threshold is not None else None
+        self.dedup_mode = dedup_mode
+        self.near_duplicates = {}
+        
+        # Extraction tier per crawl, overridden by the first matching
+        # (url regex, tier) rule. Pages whose url, title or headings mention a
+        # promote keyword are queued again for full extraction.
+        self.tier = tier
+        self.tier_rules = [(re.compile(pattern), rule_tier) for pattern, rule_tier in (tier_rules or [])]
+        self.promote_keywords = [kw.lower() for kw in (promote_keywords or [])]
+        self.page_tiers = {}
+        self.page_numbers = {}
+        self.promotions = deque()
+        
+        # Optionally record every raw response so results can be rebuilt offline
+        self.recorder = None
+        if warc_dir:
+            # Extraction settings are recorded so replay rebuilds the same output
+            info = {
+                'base-url': base_url,
+                'use-templates': 'true' if use_templates else 'false',
+                'tier': tier,
+                'tier-rules': json.dumps(tier_rules or []),
+                'promote-keywords': json.dumps(promote_keywords or [])
+            }
+            if dedup_threshold is not None:
+                # Skipped near-duplicates are archived too; replay repeats the check
+                info.update({'dedup-threshold': dedup_threshold, 'dedup-mode': dedup_mode})
+            self.recorder = warc_archive.WarcWriter(warc_dir, prefix=WARC_PREFIX, info=info, run=warc_run)
+        
+        self.session = ResilientSession(requests.Session(), recorder=self.recorder)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         })
@@ -30,12 +121,49 @@ class WebsiteCrawler:
         """Check if URL belongs to the same domain as base_url"""
         return urlparse(url).netloc == urlparse(self.base_url).netloc
     
-    def extract_page_data(self, url, html):
-        """Extract useful data from the page"""
-        soup = BeautifulSoup(html, 'html.parser')
+    def tier_for(self, url):
+        """Return the extraction tier for url"""
+        for pattern, tier in self.tier_rules:
+            if pattern.search(url):
+                return tier
+        return self.tier
+    
+    def first_tier(self, url):
+        """Return the tier a page is first extracted at"""
+        # No need to fetch twice when the URL alone already earns a promotion
+        if self.mentions_promote_keyword(url):
+            return 'full'
+        return self.tier_for(url)
+    
+    def promote(self, url, tier='full'):
+        """Queue an already crawled page to be extracted again at a richer tier"""
+        url = self.clean_url(url)
+        current = self.page_tiers.get(url)
+        if current is None or TIERS.index(tier) <= TIERS.index(current):
+            return
+        # page_tiers is only raised once the richer extraction succeeds
+        if (url, tier) not in self.promotions:
+            self.promotions.append((url, tier))
+    
+    def mentions_promote_keyword(self, text):
+        text = text.lower()
+        return any(kw in text for kw in self.promote_keywords)
+    
+    def wants_promotion(self, url, page_data):
+        """Check if a page extracted below full tier mentions a promote keyword"""
+        if page_data['tier'] == 'full':
+            return False
+        return self.mentions_promote_keyword(' '.join([url, page_data['title']] + [h['text'] for h in page_data['headings']]))
+    
+    def extract_page_data(self, url, html, tier='full'):
+        """Extract useful data from the page at the given tier"""
+        if tier == 'discovery':
+            return self.extract_discovery_data(url, html)
         
-        # Extract main content
-        main_content = trafilatura.extract(html, include_links=True, include_formatting=True)
+        from bs4 import BeautifulSoup
+        import trafilatura
+
+        soup = BeautifulSoup(html, 'html.parser')
         
         # Extract title
         title = soup.title.text if soup.title else ""
@@ -66,6 +194,13 @@ class WebsiteCrawler:
                         'text': a.get_text(strip=True) or a.get('title', '')
                     })
         
+        if tier == 'metadata':
+            return self.empty_page_data(url, tier, title=title, meta_description=meta_desc,
+                                        headings=headings, links=links)
+        
+        # Extract main content
+        main_content = trafilatura.extract(html, include_links=True, include_formatting=True)
+        
         # Look for forms (login, signup, contact)
         forms = []
         for form in soup.find_all('form'):
@@ -91,9 +226,63 @@ class WebsiteCrawler:
             
             forms.append(form_data)
         
-        # Extract navigation structure
+        # Set aside blocks that may repeat on every page (header, footer, menus);
+        # resolve_templates decides whether they are kept on the page
+        template_blocks = []
+        if self.use_templates:
+            template_blocks = self.extract_template_blocks(url, soup)
+        
+        return {
+            'url': url,
+            'title': title,
+            'meta_description': meta_desc,
+            'headings': headings,
+            'main_content': main_content,
+            'links': links,
+            'forms': forms,
+            'navigation': self.extract_navigation(soup),
+            'buttons': self.extract_buttons(soup),
+            'templates': [],
+            'template_blocks': template_blocks,
+            'tier': tier
+        }
+    
+    def extract_discovery_data(self, url, body):
+        """Collect same-site links from the raw body without building a DOM"""
+        _, page_links = extract_links(body, url)
+        links = [
+            {'url': link.url, 'text': ''}
+            for link in page_links
+            if link.tag == 'a' and link.url.startswith(('http://', 'https://')) and self.is_same_domain(link.url)
+        ]
+        return self.empty_page_data(url, 'discovery', links=links)
+    
+    def empty_page_data(self, url, tier, **fields):
+        """Return page data with the fields a tier does not extract left empty"""
+        page_data = {
+            'url': url,
+            'title': "",
+            'meta_description': "",
+            'headings': [],
+            'main_content': None,
+            'links': [],
+            'forms': [],
+            'navigation': [],
+            'buttons': [],
+            'templates': [],
+            'tier': tier
+        }
+        page_data.update(fields)
+        return page_data
+    
+    def extract_navigation(self, root):
+        """Extract navigation menu links found in root (a soup or a tag)"""
+        candidates = root.find_all(['nav', 'ul', 'div'], class_=lambda c: c and ('nav' in c.lower() or 'menu' in c.lower()))
+        if is_nav_container(root):
+            candidates.insert(0, root)
+        
         nav_items = []
-        for nav in soup.find_all(['nav', 'ul', 'div'], class_=lambda c: c and ('nav' in c.lower() or 'menu' in c.lower())):
+        for nav in candidates:
             nav_links = nav.find_all('a')
             if len(nav_links) > 3:  # Likely a navigation menu if it has several links
                 for link in nav_links:
@@ -103,10 +292,12 @@ class WebsiteCrawler:
                             'url': urljoin(self.base_url, href),
                             'text': link.get_text(strip=True)
                         })
-        
-        # Look for buttons that might trigger JS functionality
+        return nav_items
+    
+    def extract_buttons(self, root):
+        """Look for buttons in root that might trigger JS functionality"""
         buttons = []
-        for button in soup.find_all(['button', 'a'], class_=lambda c: c and ('btn' in c.lower() or 'button' in c.lower())):
+        for button in root.find_all(['button', 'a'], class_=lambda c: c and ('btn' in c.lower() or 'button' in c.lower())):
             btn_text = button.get_text(strip=True)
             btn_id = button.get('id', '')
             btn_class = button.get('class', [])
@@ -120,75 +311,215 @@ class WebsiteCrawler:
                     'class': ' '.join(btn_class) if isinstance(btn_class, list) else btn_class,
                     'href': btn_href
                 })
+        return buttons
+    
+    def extract_template_blocks(self, url, soup):
+        """Remove candidate shared blocks from soup and return them as dicts.
+
+        Each outermost header, footer, nav or nav/menu container that is not
+        part of an article or the main content is fingerprinted from its tag
+        structure, link targets and link/button text, and its navigation and
+        buttons are extracted. Blocks are removed from soup so the page-level
+        scans only see the rest of the page.
+        """
+        host = urlparse(url).netloc
+        blocks = [
+            block for block in soup.find_all(is_template_block)
+            if not block.find_parent(is_template_block) and not block.find_parent(['article', 'main'])
+        ]
         
-        return {
-            'url': url,
-            'title': title,
-            'meta_description': meta_desc,
-            'headings': headings,
-            'main_content': main_content,
-            'links': links,
-            'forms': forms,
-            'navigation': nav_items,
-            'buttons': buttons
-        }
+        template_blocks = []
+        for block in blocks:
+            template_blocks.append({
+                'id': fingerprint_block(host, block),
+                'navigation': self.extract_navigation(block),
+                'buttons': self.extract_buttons(block)
+            })
+            block.decompose()
+        return template_blocks
+    
+    def resolve_templates(self, url, page_data):
+        """Turn the page's candidate blocks into template references or page content.
+
+        A block becomes a template once it appears on a second page of the
+        host; from then on pages only keep its id. Until then its navigation
+        and buttons stay on the page. Must be called in crawl order.
+        """
+        host = urlparse(url).netloc
+        for block in page_data.pop('template_blocks', []):
+            template_id = block['id']
+            first_url = self.template_candidates.get(template_id, url)
+            if template_id not in self.templates and first_url != url:
+                self.templates[template_id] = {
+                    'host': host,
+                    'first_url': first_url,
+                    'navigation': block['navigation'],
+                    'buttons': block['buttons']
+                }
+            if template_id in self.templates:
+                if template_id not in page_data['templates']:
+                    page_data['templates'].append(template_id)
+            else:
+                self.template_candidates.setdefault(template_id, url)
+                page_data['navigation'].extend(block['navigation'])
+                page_data['buttons'].extend(block['buttons'])
+        return page_data
     
     def crawl(self, max_pages=20):
         """Crawl the website starting from base_url"""
         to_visit = [self.base_url]
         page_count = 0
+        circuit_waits = 0
         
-        while to_visit and page_count < max_pages:
-            current_url = to_visit.pop(0)
-            if current_url in self.visited_urls:
-                continue
+        # Promoted pages are re-extracted even once the page budget is spent
+        while self.promotions or (to_visit and page_count < max_pages):
+            promoted = bool(self.promotions)
+            if promoted:
+                # Re-extract a promoted page; it keeps its page number
+                current_url, tier = self.promotions.popleft()
+            else:
+                current_url, tier = to_visit.pop(0), None
+                if self.is_visited(current_url):
+                    continue
             
-            clean_current_url = self.clean_url(current_url)
-            if clean_current_url in self.visited_urls:
+            try:
+                page_data = self.crawl_page(current_url, page_count, tier)
+            except CircuitOpenError as e:
+                # The host keeps failing: put the URL back and wait for the breaker's probe
+                circuit_waits += 1
+                if circuit_waits > MAX_CIRCUIT_WAITS:
+                    print(f"Giving up on {urlparse(self.base_url).netloc}: {e}")
+                    break
+                if promoted:
+                    self.promotions.appendleft((current_url, tier))
+                else:
+                    to_visit.insert(0, current_url)
+                time.sleep(e.retry_in)
                 continue
+            if page_data is None:
+                continue
+            circuit_waits = 0
             
-            self.visited_urls.add(clean_current_url)
+            # Add new URLs to visit
+            to_visit.extend(self.new_links(page_data))
+            if not promoted:
+                page_count += 1
             
-            try:
-                print(f"Crawling: {clean_current_url}")
-                response = self.session.get(clean_current_url, timeout=10)
+            # Be nice to the server
+            time.sleep(1)
+        
+        self.finish_crawl()
+        return self.pages_data
+    
+    def is_visited(self, url):
+        return url in self.visited_urls or self.clean_url(url) in self.visited_urls
+    
+    def crawl_page(self, url, page_count, tier=None):
+        """Fetch, extract and save one page; return its data, or None if it was not a 200.
+
+        Raises CircuitOpenError, with the URL left unvisited, when the host's
+        circuit breaker refuses the request so the caller can retry it later.
+        """
+        clean_current_url = self.clean_url(url)
+        self.visited_urls.add(clean_current_url)
+        if tier is None:
+            tier = self.first_tier(clean_current_url)
+        
+        try:
+            print(f"Crawling: {clean_current_url} ({tier})")
+            response = self.session.get(clean_current_url)
+            
+            if response.status_code == 200:
+                # The discovery tier scans raw bytes, so skip decoding the body
+                body = response.content if tier == 'discovery' else response.text
+                page_data = self.extract_page_data(clean_current_url, body, tier)
+                self.resolve_templates(clean_current_url, page_data)
+                if self.dedup_index is not None and not self.check_near_duplicate(clean_current_url, page_data):
+                    return None
+                self.pages_data[clean_current_url] = page_data
+                self.page_tiers[clean_current_url] = tier
                 
-                if response.status_code == 200:
-                    page_data = self.extract_page_data(clean_current_url, response.text)
-                    self.pages_data[clean_current_url] = page_data
-                    
-                    # Save individual page data
-                    page_filename = f"{page_count}_{urlparse(clean_current_url).path.replace('/', '_')}"
-                    if page_filename.endswith('_'):
-                        page_filename += 'index'
-                    
-                    with open(f"{self.output_dir}/{page_filename}.json", 'w', encoding='utf-8') as f:
-                        json.dump(page_data, f, indent=2, ensure_ascii=False)
-                    
-                    # Add new URLs to visit
-                    for link in page_data['links']:
-                        if link['url'] not in self.visited_urls and self.is_same_domain(link['url']):
-                            to_visit.append(link['url'])
-                    
-                    page_count += 1
-                    
-                    # Be nice to the server
-                    time.sleep(1)
+                # A promoted page overwrites the file saved at the lower tier
+                page_number = self.page_numbers.setdefault(clean_current_url, page_count)
+                self.save_page(page_number, clean_current_url, page_data)
                 
-            except Exception as e:
-                print(f"Error crawling {clean_current_url}: {e}")
+                if self.wants_promotion(clean_current_url, page_data):
+                    self.promote(clean_current_url, 'full')
+                return page_data
+            
+        except CircuitOpenError:
+            # Nothing was fetched, so the URL must stay eligible for a later retry
+            self.visited_urls.discard(clean_current_url)
+            raise
+        except Exception as e:
+            print(f"Error crawling {clean_current_url}: {e}")
+        return None
+    
+    def check_near_duplicate(self, url, page_data):
+        """Index the page's content signature; return False if the page should be skipped"""
+        signature = self.dedup_index.signature(page_data['main_content'])
+        if signature is None:
+            return True
+        
+        page_data['simhash'] = f"{signature:016x}"
+        original = self.dedup_index.find(signature)
+        if original is None:
+            self.dedup_index.add(url, signature)
+            return True
+        
+        print(f"Near-duplicate of {original}: {url}")
+        self.near_duplicates[url] = original
+        page_data['near_duplicate_of'] = original
+        return self.dedup_mode != 'skip'
+    
+    def new_links(self, page_data):
+        """Return the links of a crawled page that are still worth visiting"""
+        if page_data.get('near_duplicate_of'):
+            return []
+        return [
+            link['url'] for link in page_data['links']
+            if link['url'] not in self.visited_urls and self.is_same_domain(link['url'])
+        ]
+    
+    def finish_crawl(self):
+        """Close the WARC recorder and save the crawl summary and templates"""
+        if self.recorder is not None:
+            self.recorder.close()
+        
+        self.save_summary()
+        self.save_templates()
+        
+        print(f"Crawling completed. Crawled {len(self.pages_data)} pages.")
+    
+    def save_page(self, page_count, url, page_data):
+        """Save individual page data"""
+        page_filename = f"{page_count}_{urlparse(url).path.replace('/', '_')}"
+        if page_filename.endswith('_'):
+            page_filename += 'index'
+        self.page_files[url] = f"{page_filename}.json"
+        
+        with open(f"{self.output_dir}/{page_filename}.json", 'w', encoding='utf-8') as f:
+            json.dump(page_data, f, indent=2, ensure_ascii=False)
+    
+    def save_templates(self):
+        """Save the shared page blocks referenced by the per-page files"""
+        with open(f"{self.output_dir}/templates.json", 'w', encoding='utf-8') as f:
+            json.dump(self.templates, f, indent=2, ensure_ascii=False)
+    
+    def save_summary(self, page_list=None):
+        """Save summary of all crawled pages"""
+        if page_list is None:
+            page_list = list(self.pages_data.keys())
         
-        # Save summary of all crawled pages
         with open(f"{self.output_dir}/crawl_summary.json", 'w', encoding='utf-8') as f:
             summary = {
                 'base_url': self.base_url,
-                'pages_crawled': len(self.pages_data),
-                'page_list': list(self.pages_data.keys())
+                'pages_crawled': len(page_list),
+                'page_list': page_list,
+                'page_files': [self.page_files[url] for url in page_list if url in self.page_files],
+                'near_duplicates': self.near_duplicates
             }
             json.dump(summary, f, indent=2, ensure_ascii=False)
-        
-        print(f"Crawling completed. Crawled {len(self.pages_data)} pages.")
-        return self.pages_data
     
     def analyze_structure(self):
         """Analyze the website structure and functionality"""
@@ -196,79 +527,12 @@ class WebsiteCrawler:
             print("No pages crawled yet. Run crawl() first.")
             return None
         
-        analysis = {
-            'page_count': len(self.pages_data),
-            'has_login': False,
-            'has_signup': False,
-            'has_contact_form': False,
-            'navigation_structure': [],
-            'forms_found': [],
-            'potential_functionality': []
-        }
-        
-        # Analyze navigation
-        nav_items = {}
+        analysis = new_structure_analysis()
         for url, page_data in self.pages_data.items():
-            for nav in page_data['navigation']:
-                nav_text = nav['text'].strip()
-                if nav_text:
-                    if nav_text not in nav_items:
-                        nav_items[nav_text] = set()
-                    nav_items[nav_text].add(nav['url'])
-        
-        analysis['navigation_structure'] = [
-            {'text': k, 'urls': list(v)} for k, v in nav_items.items()
-        ]
-        
-        # Look for login/signup functionality
-        login_keywords = ['login', 'log in', 'sign in', 'signin', 'account']
-        signup_keywords = ['sign up', 'signup', 'register', 'join', 'create account']
-        contact_keywords = ['contact', 'support', 'help', 'message', 'email us']
-        
-        for url, page_data in self.pages_data.items():
-            # Check forms
-            for form in page_data['forms']:
-                form_info = {
-                    'url': url,
-                    'action': form['action'],
-                    'method': form['method'],
-                    'field_count': len(form['fields']),
-                    'field_types': [f['type'] for f in form['fields']]
-                }
-                
-                analysis['forms_found'].append(form_info)
-                
-                # Analyze form purpose
-                form_has_password = any(f['type'] == 'password' for f in form['fields'])
-                form_has_email = any(f['type'] == 'email' or 'email' in f.get('name', '').lower() for f in form['fields'])
-                
-                if form_has_password and form_has_email:
-                    if any(kw in url.lower() or kw in page_data['title'].lower() for kw in signup_keywords):
-                        analysis['has_signup'] = True
-                    else:
-                        analysis['has_login'] = True
-                
-                if form_has_email and any(kw in url.lower() or kw in page_data['title'].lower() for kw in contact_keywords):
-                    analysis['has_contact_form'] = True
-            
-            # Check buttons and links
-            for button in page_data['buttons']:
-                button_text = button['text'].lower()
-                if any(kw in button_text for kw in login_keywords):
-                    analysis['has_login'] = True
-                    analysis['potential_functionality'].append({
-                        'type': 'login',
-                        'element': button,
-                        'url': url
-                    })
-                
-                if any(kw in button_text for kw in signup_keywords):
-                    analysis['has_signup'] = True
-                    analysis['potential_functionality'].append({
-                        'type': 'signup',
-                        'element': button,
-                        'url': url
-                    })
+            if page_data.get('near_duplicate_of'):
+                continue
+            analyze_page_structure(url, page_data, analysis)
+        analysis = finish_structure_analysis(analysis, self.templates)
         
         # Save analysis
         with open(f"{self.output_dir}/site_analysis.json", 'w', encoding='utf-8') as f:
@@ -276,12 +540,245 @@ class WebsiteCrawler:
         
         return analysis
 
-# Run the crawler
-if __name__ == "__main__":
-    base_url = "https://www.tribevest.com/"
-    crawler = WebsiteCrawler(base_url)
-    crawler.crawl(max_pages=10)  # Limit to 10 pages for initial exploration
+# Keywords used to spot login/signup/contact functionality
+LOGIN_KEYWORDS = ['login', 'log in', 'sign in', 'signin', 'account']
+SIGNUP_KEYWORDS = ['sign up', 'signup', 'register', 'join', 'create account']
+CONTACT_KEYWORDS = ['contact', 'support', 'help', 'message', 'email us']
+
+def new_structure_analysis():
+    """Return an empty partial structure analysis.
+
+    Partial analyses are built page by page with analyze_page_structure,
+    combined with merge_structure_analysis and turned into the
+    site_analysis.json shape by finish_structure_analysis. Navigation is
+    kept as {text: {url: True}} until then so that merging preserves order,
+    and shared template blocks as {template_id: first_url} so that each is
+    aggregated only once.
+    """
+    return {
+        'page_count': 0,
+        'has_login': False,
+        'has_signup': False,
+        'has_contact_form': False,
+        'navigation_structure': {},
+        'forms_found': [],
+        'potential_functionality': [],
+        'templates': {}
+    }
+
+def analyze_page_structure(url, page_data, analysis):
+    """Add one page's navigation, forms and buttons to a partial analysis"""
+    analysis['page_count'] += 1
+    
+    analyze_navigation(page_data['navigation'], analysis)
+    
+    # Shared blocks are aggregated once per template in finish_structure_analysis
+    for template_id in page_data.get('templates', []):
+        analysis['templates'].setdefault(template_id, url)
+    
+    # Check forms
+    for form in page_data['forms']:
+        form_info = {
+            'url': url,
+            'action': form['action'],
+            'method': form['method'],
+            'field_count': len(form['fields']),
+            'field_types': [f['type'] for f in form['fields']]
+        }
+        
+        analysis['forms_found'].append(form_info)
+        
+        # Analyze form purpose
+        form_has_password = any(f['type'] == 'password' for f in form['fields'])
+        form_has_email = any(f['type'] == 'email' or 'email' in f.get('name', '').lower() for f in form['fields'])
+        
+        if form_has_password and form_has_email:
+            if any(kw in url.lower() or kw in page_data['title'].lower() for kw in SIGNUP_KEYWORDS):
+                analysis['has_signup'] = True
+            else:
+                analysis['has_login'] = True
+        
+        if form_has_email and any(kw in url.lower() or kw in page_data['title'].lower() for kw in CONTACT_KEYWORDS):
+            analysis['has_contact_form'] = True
+    
+    analyze_buttons(url, page_data['buttons'], analysis)
+    
+    return analysis
+
+def analyze_navigation(navigation, analysis):
+    """Add navigation items to a partial analysis"""
+    nav_items = analysis['navigation_structure']
+    for nav in navigation:
+        nav_text = nav['text'].strip()
+        if nav_text:
+            if nav_text not in nav_items:
+                nav_items[nav_text] = {}
+            nav_items[nav_text][nav['url']] = True
+
+def analyze_buttons(url, buttons, analysis):
+    """Check buttons and links for login/signup functionality"""
+    for button in buttons:
+        button_text = button['text'].lower()
+        if any(kw in button_text for kw in LOGIN_KEYWORDS):
+            analysis['has_login'] = True
+            analysis['potential_functionality'].append({
+                'type': 'login',
+                'element': button,
+                'url': url
+            })
+        
+        if any(kw in button_text for kw in SIGNUP_KEYWORDS):
+            analysis['has_signup'] = True
+            analysis['potential_functionality'].append({
+                'type': 'signup',
+                'element': button,
+                'url': url
+            })
+
+def merge_structure_analysis(analysis, other):
+    """Merge partial analysis other (covering later pages) into analysis"""
+    analysis['page_count'] += other['page_count']
+    for key in ('has_login', 'has_signup', 'has_contact_form'):
+        analysis[key] = analysis[key] or other[key]
+    for nav_text, urls in other['navigation_structure'].items():
+        analysis['navigation_structure'].setdefault(nav_text, {}).update(urls)
+    analysis['forms_found'].extend(other['forms_found'])
+    analysis['potential_functionality'].extend(other['potential_functionality'])
+    for template_id, url in other['templates'].items():
+        analysis['templates'].setdefault(template_id, url)
+    return analysis
+
+def finish_structure_analysis(analysis, templates=None):
+    """Convert a partial analysis into the site_analysis.json shape.
+
+    templates maps template ids to the shared blocks saved by the crawler;
+    each referenced template is aggregated once, attributed to the first
+    page it was seen on.
+    """
+    analysis = dict(analysis)
+    for template_id, url in analysis.pop('templates').items():
+        template = (templates or {}).get(template_id)
+        if template:
+            analyze_navigation(template['navigation'], analysis)
+            analyze_buttons(url, template['buttons'], analysis)
+    
+    analysis['navigation_structure'] = [
+        {'text': k, 'urls': list(v)} for k, v in analysis['navigation_structure'].items()
+    ]
+    return analysis
+
+# Per-process crawler used by replay workers
+_replay_crawler = None
+
+def _init_replay_worker(base_url, output_dir, settings):
+    global _replay_crawler
+    _replay_crawler = WebsiteCrawler(base_url, output_dir=output_dir, **settings)
+
+def _replay_extract(item):
+    """Extract one archived page at the tier the crawl used.
+
+    A page the crawl promoted is extracted again at full tier from the same
+    body. Templates are resolved in crawl order by the caller.
+    """
+    url, body, headers = item
+    crawler = _replay_crawler
+    tier = crawler.first_tier(url)
+    # The discovery tier scans raw bytes, like the live crawl
+    page_data = crawler.extract_page_data(url, body if tier == 'discovery' else decode_body(body, headers), tier)
+    if crawler.wants_promotion(url, page_data):
+        page_data = crawler.extract_page_data(url, decode_body(body, headers), 'full')
+    return page_data
+
+def decode_body(body, headers):
+    """Decode an archived body using the charset from its Content-Type"""
+    content_type = headers.get('content-type', '')
+    charset = 'utf-8'
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset' and value:
+            charset = value.strip('"\'')
+    try:
+        return body.decode(charset, 'replace')
+    except LookupError:
+        return body.decode('utf-8', 'replace')
+
+def iter_archived_pages(warc_paths, crawler):
+    """Yield (url, body, headers) for each archived page the live crawl would have extracted"""
+    seen = set()
+    for requested_url, response in warc_archive.iter_fetches(warc_paths):
+        if response.status_code != 200:
+            continue
+        url = crawler.clean_url(requested_url)
+        if url in seen:
+            continue
+        seen.add(url)
+        yield url, response.body, response.headers
+
+def replay_archives(warc_dir, output_dir="crawled_data", base_url=None, workers=None, batch_size=256, run=None):
+    """Rebuild per-page JSON, the crawl summary and site analysis from WARC files.
+
+    Only the archives of one crawl are replayed: the latest in warc_dir, or
+    the given run. Pages are extracted at the tiers the crawl used, with
+    promoted pages re-extracted at full tier from their first archived
+    body. No network access is made; page extraction and analysis run in
+    process pools and pages are written out as they are rebuilt rather than
+    kept in memory.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+    import analysis_engine
+
+    warc_paths = warc_archive.select_run(warc_archive.find_archives(warc_dir, prefix=WARC_PREFIX), run)
+    if not warc_paths:
+        print(f"No WARC files found in {warc_dir}")
+        return None
+    info = warc_archive.read_info(warc_paths[0])
+    if base_url is None:
+        base_url = info.get('base-url', DEFAULT_BASE_URL)
+    
+    # Repeat the crawl's tiers and template handling; archives written
+    # before these were recorded were crawled at full tier
+    settings = {
+        'use_templates': info.get('use-templates', 'true') != 'false',
+        'tier': info.get('tier', 'full'),
+        'tier_rules': json.loads(info.get('tier-rules', '[]')),
+        'promote_keywords': json.loads(info.get('promote-keywords', '[]'))
+    }
+    # Near-duplicates are checked in crawl order by this process only
+    dedup_threshold = int(info['dedup-threshold']) if 'dedup-threshold' in info else None
+    crawler = WebsiteCrawler(base_url, output_dir=output_dir, dedup_threshold=dedup_threshold,
+                             dedup_mode=info.get('dedup-mode', 'mark'), **settings)
+    pages = iter_archived_pages(warc_paths, crawler)
+    page_list = []
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_replay_worker, initargs=(base_url, output_dir, settings)) as pool:
+        # Submit in bounded batches so huge archives are never held in memory at once
+        while True:
+            batch = list(islice(pages, batch_size))
+            if not batch:
+                break
+            for (url, _, _), page_data in zip(batch, pool.map(_replay_extract, batch, chunksize=8)):
+                crawler.resolve_templates(url, page_data)
+                if crawler.dedup_index is not None and not crawler.check_near_duplicate(url, page_data):
+                    continue
+                crawler.save_page(len(page_list), url, page_data)
+                page_list.append(url)
+    
+    crawler.save_summary(page_list)
+    crawler.save_templates()
+    print(f"Replay completed. Rebuilt {len(page_list)} pages from {len(warc_paths)} archive(s).")
+    return analysis_engine.run_analysis(output_dir, workers=workers)
+
+def main(base_url=DEFAULT_BASE_URL, max_pages=10, output_dir="crawled_data", warc_dir=None, use_templates=True,
+         dedup_threshold=None, dedup_mode='mark', tier='full', tier_rules=None, promote_keywords=None):
+    """Crawl base_url, analyze the result and print a short report"""
+    crawler = WebsiteCrawler(base_url, output_dir=output_dir, warc_dir=warc_dir, use_templates=use_templates,
+                             dedup_threshold=dedup_threshold, dedup_mode=dedup_mode, tier=tier,
+                             tier_rules=tier_rules, promote_keywords=promote_keywords)
+    crawler.crawl(max_pages=max_pages)
     analysis = crawler.analyze_structure()
+    if analysis is None:
+        return None
     
     print("\nWebsite Analysis:")
     print(f"Pages crawled: {analysis['page_count']}")
@@ -295,4 +792,10 @@ if __name__ == "__main__":
     
     print("\nPotential functionality:")
     for func in analysis['potential_functionality']:
-        print(f" - {func['type']} at {func['url']}")
\ No newline at end of file
+        print(f" - {func['type']} at {func['url']}")
+    
+    return analysis
+
+# Run the crawler
+if __name__ == "__main__":
+    main(max_pages=10)  # Limit to 10 pages for initial exploration